@@ -1,12 +1,17 @@
 from dataclasses import dataclass
 from enum import Enum
+from typing import Tuple
 
 class Uploader(Enum):
     GITHUB = 1
     DROPBOX = 2
+    LOCAL = 3
 
 @dataclass(frozen=True)
 class Config:
     UPLOAD_WAY: Uploader = Uploader.DROPBOX
+    MIRRORS: Tuple[Uploader, ...] = ()
+    MIRROR_TIMEOUT: int = 120
+    PIPELINE_WORKERS: int = 4
 
-config = Config()
\ No newline at end of file
+config = Config()
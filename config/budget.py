@@ -0,0 +1,25 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+@dataclass(frozen=True)
+class BudgetConfig:
+    DEADLINE_SECONDS: int = int(os.getenv("RUN_DEADLINE_SECONDS", 12 * 60))
+    STAGE_BUDGETS: Dict[str, int] = field(default_factory=lambda: {
+        "parse": 360,
+        "generate": 60,
+        "serialize": 30,
+        "upload": 180,
+        "readme": 15
+    })
+    MIN_UPLOAD_SECONDS: int = 10
+    CALENDAR_PRIORITY: Tuple[str, ...] = (
+        "Экзамен",
+        "Зачет",
+        "Лекции",
+        "Практические занятия",
+        "Лабораторные занятия",
+        "Консультации"
+    )
+
+budget_config = BudgetConfig()
@@ -1,9 +1,28 @@
+import os
 from dataclasses import dataclass, field
-from typing import Dict
+from enum import Enum
+from typing import Dict, Optional
+
+class OutputProfile(Enum):
+    FULL = 1
+    COMPACT = 2
 
 @dataclass(frozen=True)
 class CalendarGeneratorConfig:
-    CALENDAR_DIR: str = "calendars"
+    CALENDAR_DIR: str = os.getenv("CALENDAR_DIR", "calendars")
+    GENERATIONS: bool = os.name == "posix"
+    GENERATIONS_SUFFIX: str = ".generations"
+    KEEP_GENERATIONS: int = 3
+    TIMEZONE: str = "Europe/Moscow"
+    OUTPUT_PROFILE: OutputProfile = OutputProfile.COMPACT
+    WRITE_GZIP: bool = True
+    GZIP_LEVEL: int = 9
+    RECURRENCE: bool = True
+    PARALLEL: bool = False
+    MAX_WORKERS: Optional[int] = None
+    LIGHT_FEED_WEEKS: int = 4
+    LIGHT_FEED_SUFFIX: str = " (ближайшие недели)"
+    MONTHLY_SHARDS: bool = False
     COLORS: Dict[int, str] = field(default_factory=lambda: {
         1: "#0091ff",
         2: "#a50aff",
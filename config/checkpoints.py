@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class CheckpointConfig:
+    CHECKPOINT_FILE: str = "checkpoints.json"
+    RUN_LOCK_FILE: str = "run.lock"
+    RUN_LOCK_TIMEOUT: int = 0
+
+checkpoint_config = CheckpointConfig()
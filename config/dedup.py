@@ -0,0 +1,13 @@
+import os
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class DedupConfig:
+    ENABLED: bool = True
+    STORE_FILE: str = os.getenv("LESSON_STORE", ".session_cache/lessons.sqlite3")
+    GROUP_CALENDARS: bool = os.getenv("GROUP_CALENDARS", "") == "1"
+    GROUP_DIR: str = os.getenv("GROUP_DIR", "groups")
+    MAX_AGE: int = 30 * 24 * 3600
+    BUSY_TIMEOUT: int = 30
+
+dedup_config = DedupConfig()
@@ -0,0 +1,31 @@
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+@dataclass(frozen=True)
+class EnrichmentConfig:
+    ENABLED: bool = True
+    RESOLVER: str = "static"
+    CACHE_FILE: str = ".session_cache/enrichment.json"
+    LOCK_FILE: str = ".session_cache/enrichment.json.lock"
+    LOCK_TIMEOUT: int = 30
+    TEACHER_TTL: int = 30 * 24 * 60 * 60
+    BUILDING_TTL: int = 90 * 24 * 60 * 60
+    BATCH_SIZE: int = 50
+
+    TEACHER_PROFILE_URL: str = "https://isu.itmo.ru/person/{teacher_id}"
+    BUILDINGS: Dict[str, Tuple[str, float, float]] = field(default_factory=lambda: {
+        "Кронверкский пр., д.49, лит.А": ("Санкт-Петербург, Кронверкский пр., 49", 59.956425, 30.310041),
+        "ул. Ломоносова, д.9, лит.М": ("Санкт-Петербург, ул. Ломоносова, 9", 59.926912, 30.338402),
+        "ул. Гастелло, д.12, лит.А": ("Санкт-Петербург, ул. Гастелло, 12", 59.864212, 30.318489),
+        "пер. Гривцова, д.14, лит.А": ("Санкт-Петербург, пер. Гривцова, 14", 59.929539, 30.316712),
+        "Биржевая линия, д.14, лит.А": ("Санкт-Петербург, Биржевая линия, 14", 59.944066, 30.295090),
+        "ул. Чайковского, д.11/2, лит.А": ("Санкт-Петербург, ул. Чайковского, 11/2", 59.946968, 30.349622)
+    })
+
+    NOMINATIM_URL: str = "https://nominatim.openstreetmap.org/search"
+    NOMINATIM_USER_AGENT: str = "itmo-schedule-ics"
+    NOMINATIM_CITY: str = "Санкт-Петербург"
+    NOMINATIM_INTERVAL: float = 1.0
+    TIMEOUT: int = 10
+
+enrichment_config = EnrichmentConfig()
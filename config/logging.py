@@ -7,4 +7,9 @@ class LogConfig:
     LOG_DIR: str = "logs"
     LOG_FILE: str = "schedule.log"
 
-log_config = LogConfig()
\ No newline at end of file
+    JSON_FORMAT: bool = False
+    MAX_BYTES: int = 5 * 1024 * 1024
+    BACKUP_COUNT: int = 3
+    QUEUE_SIZE: int = 10000
+
+log_config = LogConfig()
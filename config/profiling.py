@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    PROFILE_DIR: str = "profile"
+    TOP_ALLOCATIONS: int = 25
+    TRACEMALLOC_FRAMES: int = 10
+    MAX_STACK_DEPTH: int = 64
+
+profiling_config = ProfilingConfig()
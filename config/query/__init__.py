@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class QueryConfig:
+    INDEX_DIR: str = "data"
+    INDEX_SUFFIX: str = ".index.pickle"
+    DAY_START: str = "08:00"
+    DAY_END: str = "22:00"
+
+query_config = QueryConfig()
@@ -4,6 +4,8 @@ from typing import Dict
 @dataclass(frozen=True)
 class ReadMeUpdaterConfig:
     README_FILE: str = "README.md"
+    STATUS_DIR: str = "data"
+    STATUS_FILE: str = "readme_status.json"
     CALENDAR_APPS: Dict[str, Dict[str, str]] = field(default_factory= lambda: {
             "Apple Calendar (iOS/Mac)": {
                 "url": "webcal://{download_url_clean}",
@@ -167,8 +169,42 @@ class ReadMeUpdaterConfig:
         
 ### Техническая поддержка
 Если проблемы сохраняются:
-1. Проверьте время последнего обновления
-2. Убедитесь, что используется актуальная ссылка
+1. Откройте прямую ссылку на .ics в браузере и проверьте, что ближайшие события совпадают с расписанием в ИСУ
+2. Убедитесь, что используется актуальная ссылка из этого README
+3. README переписывается только при изменении ссылок, поэтому дата его последнего изменения не показывает, когда обновлялись календари
     """
+    README_TEMPLATE: str = """# ITMO Schedule ICS
+
+{content_list}
+
+## 📅 Календари для подписки
+
+*Автоматически обновляемые iCalendar (.ics) файлы*
+
+**📊 Количество календарей:** `{calendars_count}`
+
+---
+
+{calendar_sections}{setup_guides}
+{troubleshooting}
+{start_guide}"""
+    CALENDAR_SECTION_TEMPLATE: str = """### 📅 {calendar_name}
+
+#### 🔗 Ссылки для подписки
+{subscription_links}
+
+#### 📎 Дополнительные ссылки
+📥 Прямая загрузка
+
+{download_url}
+{variant_links}
+---
+
+"""
+    VARIANT_LINK_TEMPLATE: str = """
+{icon} {label}
+
+{download_url}
+"""
 
 readme_updater_config = ReadMeUpdaterConfig()
\ No newline at end of file
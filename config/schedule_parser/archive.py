@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class ArchiveConfig:
+    ENABLED: bool = True
+    ARCHIVE_DIR: str = ".session_cache/snapshots"
+    INDEX_FILE: str = "index.json"
+    LOCK_FILE: str = "index.json.lock"
+    LOCK_TIMEOUT: int = 30
+    MAX_BYTES: int = 64 * 1024 * 1024
+    MAX_ENTRIES: int = 5000
+    GZIP_LEVEL: int = 9
+    ZSTD_LEVEL: int = 19
+
+archive_config = ArchiveConfig()
@@ -4,5 +4,11 @@ from dataclasses import dataclass
 class CacheConfig:
     CACHE_DIR: str = ".session_cache"
     COOKIES_FILE: str = "cookies.json"
+    LOCK_FILE: str = "cookies.json.lock"
+    LOCK_TIMEOUT: int = 30
 
-cache_config = CacheConfig()
\ No newline at end of file
+    TOKEN_COOKIE: str = "auth._token.itmoId"
+    TOKEN_EXPIRATION_COOKIE: str = "auth._token_expiration.itmoId"
+    EXPIRY_MARGIN: int = 60
+
+cache_config = CacheConfig()
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class PlannerConfig:
+    ACADEMIC_YEAR_START_MONTH: int = 9
+    ACADEMIC_YEAR_START_DAY: int = 1
+    ACADEMIC_YEAR_END_MONTH: int = 7
+    ACADEMIC_YEAR_END_DAY: int = 1
+
+    NEAR_HORIZON_DAYS: int = 14
+    FAR_WINDOW_DAYS: int = 7
+    FAR_REFRESH_INTERVAL: int = 3 * 24 * 60 * 60
+
+    FRESHNESS_FILE: str = "freshness.json"
+
+planner_config = PlannerConfig()
@@ -1,9 +1,21 @@
 from dataclasses import dataclass
+from typing import Tuple
 
 @dataclass(frozen=True)
 class SeleniumConfig:
     HEADLESS: bool = True
     WINDOW_SIZE: str = "1200,800"
     TIMEOUT: int = 60
+    CANCEL_POLL_INTERVAL: float = 0.5
 
-selenium_config = SeleniumConfig()
\ No newline at end of file
+    OPTIMIZED_LOGIN: bool = True
+    PAGE_LOAD_STRATEGY: str = "eager"
+    ALLOWED_HOSTS: Tuple[str, ...] = ("my.itmo.ru", "id.itmo.ru")
+    BLOCKED_URL_PATTERNS: Tuple[str, ...] = (
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*.mp4", "*.webm", "*.mp3",
+        "*.css",
+    )
+
+selenium_config = SeleniumConfig()
@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+@dataclass(frozen=True)
+class TransportConfig:
+    POOL_CONNECTIONS: int = 16
+    POOL_MAXSIZE: int = 8
+    POOL_BLOCK: bool = True
+    HOST_LIMITS: Dict[str, int] = field(default_factory=lambda: {
+        "my.itmo.ru": 2,
+        "api.github.com": 4,
+        "api.dropboxapi.com": 4,
+        "content.dropboxapi.com": 4
+    })
+    TCP_KEEPALIVE: bool = True
+    DNS_CACHE_TTL: int = 300
+
+transport_config = TransportConfig()
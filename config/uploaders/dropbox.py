@@ -7,4 +7,11 @@ class DropboxConfig:
     DROPBOX_APP_KEY: str = os.getenv("DROPBOX_APP_KEY")
     DROPBOX_APP_SECRET: str = os.getenv("DROPBOX_APP_SECRET")
 
-dropbox_config = DropboxConfig()
\ No newline at end of file
+    TOKEN_URL: str = "https://api.dropboxapi.com/oauth2/token"
+    TOKEN_CACHE_FILE: str = "dropbox_token.json"
+    TOKEN_LOCK_FILE: str = "dropbox_token.json.lock"
+    TOKEN_LOCK_TIMEOUT: int = 30
+    TOKEN_EXPIRY_MARGIN: int = 5 * 60
+    TIMEOUT: int = 30
+
+dropbox_config = DropboxConfig()
@@ -6,5 +6,8 @@ class GithubConfig:
     GITHUB_TOKEN: str = os.getenv("TOKEN")
     REPO: str = os.getenv("REPO")
     BRANCH: str = "main"
+    HTTP_CACHE: bool = True
+    HTTP_CACHE_DIR: str = ".session_cache/github_http"
+    HTTP_CACHE_MAX_AGE: int = 7 * 24 * 3600
 
 github_config = GithubConfig()
\ No newline at end of file
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True)
+class LocalConfig:
+    TARGET_DIR: str = "public"
+    BASE_URL: Optional[str] = None
+
+local_config = LocalConfig()
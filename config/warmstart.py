@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class WarmStartConfig:
+    ENABLED: bool = True
+    RESTORE_FILES: bool = True
+
+warmstart_config = WarmStartConfig()
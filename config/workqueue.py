@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class WorkQueueConfig:
+    QUEUE_FILE: str = ".session_cache/workqueue.sqlite3"
+    WORKSPACE_DIR: str = "workspaces"
+    VISIBILITY_TIMEOUT: int = 600
+    MAX_ATTEMPTS: int = 3
+    RETRY_BACKOFF: int = 30
+    POLL_INTERVAL: float = 2.0
+    JOB_TIMEOUT: int = 540
+    BUSY_TIMEOUT: int = 30
+
+workqueue_config = WorkQueueConfig()
@@ -1,91 +1,374 @@
+import argparse
+import json
 import logging
 import sys
+import threading
 import time
+from functools import partial
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
 
-from config import Uploader, config
-from config.logging import log_config
-from src.calendar_generator import CalendarsGenerator
+from config import config
+from config.budget import budget_config
+from config.calendar_generator import calendar_generator_config
+from config.dedup import dedup_config
+from config.enrichment import enrichment_config
+from config.schedule_parser import schedule_parser_config
+from src.calendar_generator import GENERATOR_VERSION, CalendarsGenerator, light_window, split_feed_name
+from src.calendar_generator.recurrence import MIN_OCCURRENCES
+from src.calendar_generator.changes import diff_calendars
+from src.calendar_generator.generations import GenerationWriter
+from src.enrichment import Enricher, Enrichment, create_resolver
+from src.dedup import LessonStore
+from src.checkpoints import CheckpointStore, RunInProgressError, hash_file, hash_parts
+from src.logger import setup_logging
+from src.pipeline import StageError, StageGraph
+from src.pipeline.budget import RunBudget
+from src.profiling import StageProfiler
 from src.readme_updater import ReadMeUpdater
 from src.schedule_parser import ScheduleParser
-
-if config.UPLOAD_WAY == Uploader.GITHUB:
-    from src.uploaders.github import GitHubUploader
-if config.UPLOAD_WAY == Uploader.DROPBOX:
-    from src.uploaders.dropbox import DropboxUploader
+from src.schedule_parser.lesson import Schedule, decode_schedule
+from src.transport import transport_stats
+from src.transport.conditional import conditional_stats
+from src.uploaders.fanout import FanOutUploader
+from src.warmstart import WarmStart
 
 load_dotenv()
 
-log_dir = Path(log_config.LOG_DIR)
-log_dir.mkdir(exist_ok=True)
-
-logging.basicConfig(
-    level=getattr(logging, log_config.LEVEL),
-    format=log_config.FORMAT,
-    handlers=[
-        logging.FileHandler(log_dir / log_config.LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
-def main():
-    start_time = time.time()
-    logger.info("=" * 60)
-    logger.info("Program started")
-    logger.info("=" * 60)
+def _fetch(checkpoints: CheckpointStore, cancel: threading.Event) -> Tuple[Path, Optional[Schedule]]:
+    data_path = Path(schedule_parser_config.RESULT_DIR) / schedule_parser_config.RESULT_FILE
+    run_id = checkpoints.run_id()
 
-    try:
-        parser = ScheduleParser()
-        response = parser.parse()
-        data_path = parser.save()
-        schedule_parser_time = time.time() - start_time
-    except Exception as e:
-        logger.error(f"Schedule parser failed with error: {e}")
-        sys.exit(1)
+    cached = checkpoints.get("fetch", run_id)
+    if cached and cached.get("data_hash") == hash_file(data_path):
+        logger.info("Fetch already completed in this run, reusing %s", data_path)
+        return data_path, None
+
+    parser = ScheduleParser(cancel=cancel)
+    parser.parse()
+    data_path = parser.save()
+    checkpoints.complete("fetch", run_id, {"data_hash": hash_file(data_path)}, run_scoped=True)
+    return data_path, parser.schedule
+
+def _fetch_fallback(budget: RunBudget, cancel: threading.Event) -> Tuple[Path, Optional[Schedule]]:
+    cancel.set()
+    data_path = Path(schedule_parser_config.RESULT_DIR) / schedule_parser_config.RESULT_FILE
+    if not data_path.exists():
+        raise TimeoutError("Fetch ran out of time and there is no previous schedule data")
+    budget.defer("parse", "fetch ran out of time, using the previous schedule data")
+    return data_path, None
+
+def _warm_start(checkpoints: CheckpointStore, uploader: FanOutUploader) -> int:
+    warm_start = WarmStart(checkpoints, uploader)
+    if not warm_start.needed():
+        return 0
+    logger.info("No upload checkpoints found, bootstrapping from published calendars")
+    return sum(result.calendars for result in warm_start.bootstrap())
+
+def _calendar_priority(calendar_name: str) -> int:
+    base_name, variant = split_feed_name(calendar_name)
+    work_type = base_name.removeprefix("ITMO ")
+    priorities = budget_config.CALENDAR_PRIORITY
+    rank = priorities.index(work_type) if work_type in priorities else len(priorities)
+    return rank * 2 + (variant is not None)
 
+def _previous_calendars() -> Dict[str, Path]:
+    return {path.stem: path for path in Path(calendar_generator_config.CALENDAR_DIR).glob("*.ics")}
+
+def _enrich(fetched: Tuple[Path, Optional[Schedule]]) -> Enrichment:
+    if not enrichment_config.ENABLED:
+        return Enrichment()
+
+    data_path, schedule = fetched
     try:
-        generator = CalendarsGenerator(data_path)
-        calendars = generator.generate()
-        calendars_paths = generator.save()
-        calendars_generator_time = time.time() - schedule_parser_time
+        if schedule is None:
+            with open(data_path, "r", encoding="utf-8") as f:
+                schedule = decode_schedule(json.load(f))
+
+        enricher = Enricher(create_resolver(enrichment_config.RESOLVER))
+        return enricher.enrich(lesson for lessons in schedule.values() for lesson in lessons)
     except Exception as e:
-        logger.error(f"Calendar generator failed with error: {e}")
-        sys.exit(1)
+        logger.warning("Enrichment failed, generating calendars without it: %s", e, extra={"stage": "enrich"})
+        return Enrichment()
+
+def _generate_input_hash(data_path: Path, enrichment: Enrichment) -> str:
+    return hash_parts(
+        Path(data_path).read_bytes(),
+        str(GENERATOR_VERSION),
+        repr(calendar_generator_config),
+        str(MIN_OCCURRENCES),
+        str(light_window()[0]) if calendar_generator_config.LIGHT_FEED_WEEKS > 0 else "",
+        enrichment.fingerprint()
+    )
+
+def _generate(
+    checkpoints: CheckpointStore,
+    budget: RunBudget,
+    store: Optional[LessonStore],
+    fetched: Tuple[Path, Optional[Schedule]],
+    enrichment: Enrichment
+) -> Tuple[CalendarsGenerator, bool]:
+    data_path, schedule = fetched
+    generation = GenerationWriter() if calendar_generator_config.GENERATIONS else None
+    generator = CalendarsGenerator(data_path, enrichment=enrichment, store=store, generation=generation)
+
+    cached = checkpoints.get("generate", _generate_input_hash(data_path, enrichment))
+    if cached and all(hash_file(path) == file_hash for path, file_hash in cached.values()):
+        generator.load_saved({calendar_name: Path(path) for calendar_name, (path, _) in cached.items()})
+        return generator, True
 
-    if config.UPLOAD_WAY == Uploader.GITHUB:
-        uploader = GitHubUploader()
-    elif config.UPLOAD_WAY == Uploader.DROPBOX:
-        uploader = DropboxUploader()
+    previous = _previous_calendars()
+    if previous and not budget.allows("generate"):
+        generator.load_saved(previous)
+        budget.defer("generate", f"reused {len(previous)} previously generated calendar(s)")
+        return generator, True
+
+    generator.generate(schedule)
+    return generator, False
+
+def _serialize(budget: RunBudget, calendar_name: str, generated: Tuple[CalendarsGenerator, bool]) -> Path:
+    generator, reused = generated
+    calendar_path = generator.calendar_path(calendar_name)
+    if reused:
+        return calendar_path
+
+    if calendar_path.exists() and not budget.allows("serialize"):
+        generator.load_saved({calendar_name: calendar_path})
+        budget.defer(f"serialize:{calendar_name}", "kept the previously generated file")
+        return calendar_path
+
+    previous = calendar_path.read_bytes() if calendar_path.exists() else None
+    generator.save_calendar(calendar_name)
+    output_path = generator.output_path(calendar_name)
+    current = output_path.read_bytes()
+    if previous == current:
+        return calendar_path
+
+    if previous is None:
+        logger.info("Calendar '%s' is new", calendar_name, extra={"calendar": calendar_name})
     else:
-        logger.error(f"Unknown upload way: {config.UPLOAD_WAY}")
-        sys.exit(1)
+        changes = diff_calendars(previous, current)
+        logger.info(
+            "Calendar '%s' changed: %s added, %s removed, %s modified, %s unchanged event(s)",
+            calendar_name, changes.added, changes.removed, changes.changed, changes.unchanged,
+            extra={"calendar": calendar_name}
+        )
+    return output_path
 
+def _publish(generated: Tuple[CalendarsGenerator, bool], *calendars_paths: Path) -> Dict[str, Path]:
+    generator, _ = generated
+    return generator.publish()
+
+def _record_generate(
+    checkpoints: CheckpointStore,
+    budget: RunBudget,
+    data_path: Path,
+    generated: Tuple[CalendarsGenerator, bool],
+    calendars_paths: Dict[str, Path]
+) -> None:
+    generator, reused = generated
+    if reused or budget.is_deferred("serialize:"):
+        return
+    checkpoints.complete("generate", _generate_input_hash(data_path, generator.enrichment), {
+        calendar_name: [str(path), hash_file(path)] for calendar_name, path in calendars_paths.items()
+    })
+
+def _upload(
+    uploader: FanOutUploader,
+    budget: RunBudget,
+    calendar_name: str,
+    groups: Dict[str, str],
+    generated: Tuple[CalendarsGenerator, bool],
+    calendar_path: Path
+) -> Dict[str, str]:
+    if not budget.allows_upload():
+        budget.defer(f"upload:{calendar_name}", "not published, the previous version stays online")
+        return {}
+
+    generator, _ = generated
+    return uploader.upload(
+        {calendar_name: generator.calendars[calendar_name]},
+        {calendar_name: calendar_path},
+        groups={calendar_name: groups[calendar_name]} if calendar_name in groups else None
+    )
+
+def _upload_fallback(budget: RunBudget, calendar_name: str, *results: object) -> Dict[str, str]:
+    budget.defer(f"upload:{calendar_name}", "upload ran out of time, the previous version stays online")
+    return {}
+
+def _update_readme(
+    checkpoints: CheckpointStore,
+    budget: RunBudget,
+    *uploaded_links: Dict[str, str]
+) -> Dict[str, str]:
+    calendar_links: Dict[str, str] = {}
+    for links in uploaded_links:
+        calendar_links.update(links)
+
+    if budget.is_deferred("upload:"):
+        budget.defer("readme", "skipped because some calendars were not published")
+        return calendar_links
+    if not budget.allows("readme"):
+        budget.defer("readme", "skipped, not enough time left")
+        return calendar_links
+
+    input_hash = hash_parts(json.dumps(calendar_links, sort_keys=True, ensure_ascii=False))
+    if checkpoints.get("readme", input_hash):
+        return calendar_links
+
+    readme_updater = ReadMeUpdater()
+    readme_updater.update_readme(calendar_links)
+    checkpoints.complete("readme", input_hash, True, run_scoped=True)
+    return calendar_links
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ITMO schedule to ICS pipeline")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="profile every stage with cProfile and tracemalloc into logs/profile/<run-id>/"
+    )
+    return parser.parse_args()
+
+def main():
+    args = _parse_args()
+    checkpoints = CheckpointStore()
+    profiler = StageProfiler(enabled=args.profile)
     try:
-        calendar_links = uploader.upload(calendars, calendars_paths)
-        uploader_time = time.time() - schedule_parser_time - calendars_generator_time
-    except Exception as e:
-        logger.error(f"Uploader failed with error: {e}")
+        with checkpoints.run_lock(), profiler.session():
+            run(checkpoints, profiler)
+    except RunInProgressError as e:
+        logger.error("%s, exiting", e)
         sys.exit(1)
 
+def _schedule_calendars(
+    graph: StageGraph,
+    checkpoints: CheckpointStore,
+    budget: RunBudget,
+    uploader: FanOutUploader,
+    store: Optional[LessonStore],
+    fetched: Tuple[Path, Optional[Schedule]],
+    enrichment: Enrichment,
+    warm_started: int
+) -> Tuple[CalendarsGenerator, bool]:
+    if warm_started:
+        logger.info("Cold start: %s calendar(s) were bootstrapped from the published backends", warm_started)
+    generated = _generate(checkpoints, budget, store, fetched, enrichment)
+    generator, _ = generated
+    groups = generator.calendar_groups(fetched[1]) if store and dedup_config.GROUP_CALENDARS else {}
+
+    serialize_tasks = []
+    upload_tasks = []
+    for calendar_name in generator.calendars:
+        serialize_task = f"serialize:{calendar_name}"
+        graph.add(
+            serialize_task, partial(_serialize, budget, calendar_name),
+            deps=["generate"], stage="serialize", priority=_calendar_priority(calendar_name)
+        )
+        serialize_tasks.append(serialize_task)
+
+        upload_task = f"upload:{calendar_name}"
+        graph.add(
+            upload_task, partial(_upload, uploader, budget, calendar_name, groups),
+            deps=["generate", serialize_task], stage="upload", priority=_calendar_priority(calendar_name),
+            timeout=budget.stage_timeout("upload"), fallback=partial(_upload_fallback, budget, calendar_name)
+        )
+        upload_tasks.append(upload_task)
+
+    graph.add("publish", _publish, deps=["generate", *serialize_tasks], stage="serialize")
+    graph.add(
+        "checkpoint:generate", partial(_record_generate, checkpoints, budget, fetched[0]),
+        deps=["generate", "publish"], stage="serialize"
+    )
+    graph.add("readme", partial(_update_readme, checkpoints, budget), deps=upload_tasks)
+    return generated
+
+def run(checkpoints: CheckpointStore, profiler: StageProfiler):
+    start_time = time.time()
+    logger.info("=" * 60)
+    logger.info("Program started")
+    logger.info("=" * 60)
+
+    checkpoints.begin_run()
+    budget = RunBudget(started_at=start_time)
+    store = LessonStore() if dedup_config.ENABLED else None
+
+    uploader = FanOutUploader(
+        [config.UPLOAD_WAY, *config.MIRRORS],
+        mirror_timeout=config.MIRROR_TIMEOUT,
+        checkpoints=checkpoints,
+        store=store
+    )
+    graph = StageGraph(max_workers=config.PIPELINE_WORKERS, profiler=profiler)
+    cancel_fetch = threading.Event()
+    graph.add(
+        "parse", partial(_fetch, checkpoints, cancel_fetch),
+        timeout=budget.stage_timeout("parse"), fallback=partial(_fetch_fallback, budget, cancel_fetch)
+    )
+    graph.add("warmstart", partial(_warm_start, checkpoints, uploader))
+    graph.add("enrich", _enrich, deps=["parse"])
+    graph.add(
+        "generate", partial(_schedule_calendars, graph, checkpoints, budget, uploader, store),
+        deps=["parse", "enrich", "warmstart"]
+    )
+
     try:
-        readme_updater = ReadMeUpdater()
-        readme_updater.update_readme(calendar_links)
-        readme_updater_time = time.time() - schedule_parser_time - calendars_generator_time - uploader_time
-    except Exception as e:
-        logger.error(f"Readme updater failed with error: {e}")
+        results = graph.run()
+    except StageError as e:
+        logger.error("Stage %s failed with error: %s", e.stage, e.error, extra={"stage": e.stage})
         sys.exit(1)
+    finally:
+        uploader.close()
+
+    checkpoints.finish_run()
+    if store:
+        store.prune()
 
+    generator, _ = results["generate"]
+    durations = graph.stage_durations()
+    critical_path = graph.critical_path()
     total_time = time.time() - start_time
     logger.info("=" * 60)
     logger.info("Program finished")
-    logger.info(f"Schedule parser took: {schedule_parser_time}: seconds")
-    logger.info(f"Calendar generator took: {calendars_generator_time}: seconds")
-    logger.info(f"Uploader took: {uploader_time}: seconds")
-    logger.info(f"Readme updater took: {readme_updater_time} seconds")
-    logger.info(f"Total time taken: {total_time} seconds")
+    logger.info("Schedule parser took: %.2f seconds", durations.get("parse", 0.0))
+    logger.info("Enrichment took: %.2f seconds", durations.get("enrich", 0.0))
+    logger.info("Calendar generator took: %.2f seconds", durations.get("generate", 0.0))
+    logger.info("Serialization took: %.2f seconds", durations.get("serialize", 0.0))
+    logger.info("Uploader took: %.2f seconds", durations.get("upload", 0.0))
+    logger.info("Readme updater took: %.2f seconds", durations.get("readme", 0.0))
+    logger.info(
+        "Critical path: %s (%.2f of %.2f seconds wall-clock)",
+        critical_path.describe(), critical_path.busy_time, critical_path.wall_time
+    )
+    logger.info("Total time taken: %.2f seconds", total_time)
+    for host, stats in sorted(transport_stats().items()):
+        logger.info(
+            "Host %s: %s request(s), %s handshake(s), %s reused, DNS %s lookup(s) / %s cache hit(s)",
+            host, stats.requests, stats.connections, stats.reused, stats.dns_lookups, stats.dns_hits
+        )
+    if store:
+        logger.info("Lesson store: %s event(s) reused, %s built and stored", store.hits, store.stored)
+    for cache_name, stats in sorted(conditional_stats().items()):
+        logger.info(
+            "%s API cache: %s not-modified hit(s), %s miss(es), %s stored, rate limit remaining %s",
+            cache_name, stats.hits, stats.misses, stats.stored, stats.rate_limit_remaining
+        )
+    logger.info("Deadline budget: %.0f of %.0f seconds used", budget.elapsed(), budget.deadline_seconds)
+    if budget.deferred:
+        for deferral in budget.deferred:
+            logger.warning("Deferred %s: %s", deferral.item, deferral.reason, extra={"stage": "budget"})
+    else:
+        logger.info("Nothing was deferred")
+    for calendar_name, size in generator.sizes.items():
+        logger.info(
+            "Calendar '%s': %s bytes, gzip %s bytes (%.0f%% smaller)",
+            calendar_name, size.ics_bytes, size.gzip_bytes, size.reduction * 100,
+            extra={"calendar": calendar_name}
+        )
     logger.info("=" * 60)
 
 if __name__ == "__main__":
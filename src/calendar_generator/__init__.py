@@ -1,54 +1,119 @@
+import gzip
 import json
 import logging
-from datetime import datetime, timedelta
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from icalendar import Calendar, Event
+from icalendar import Calendar, Event, Timezone, vText
 import pytz
 
-from config.calendar_generator.__init__ import calendar_generator_config
+from config.calendar_generator.__init__ import OutputProfile, calendar_generator_config
+from src.calendar_generator.generations import GenerationWriter
+from src.calendar_generator.recurrence import Series, detect_series, event_signature
+from src.checkpoints import hash_parts
+from src.dedup import LessonStore, event_key
+from src.enrichment import Enrichment
+from src.schedule_parser.lesson import Lesson, Schedule, decode_schedule
+from src.storage import atomic_write
 
 logger = logging.getLogger(__name__)
 
+GENERATOR_VERSION = 2
+
+_MONTH_SHARD_PATTERN = re.compile(r"^(?P<base>.+) \((?P<month>\d{4}-\d{2})\)$")
+
+def light_window(today: Optional[date] = None) -> Tuple[date, date]:
+    today = today or date.today()
+    start = today - timedelta(days=today.weekday())
+    return start, start + timedelta(weeks=calendar_generator_config.LIGHT_FEED_WEEKS)
+
+def split_feed_name(calendar_name: str) -> Tuple[str, Optional[str]]:
+    suffix = calendar_generator_config.LIGHT_FEED_SUFFIX
+    if suffix and calendar_name.endswith(suffix):
+        return calendar_name[:-len(suffix)], "light"
+    match = _MONTH_SHARD_PATTERN.match(calendar_name)
+    if match:
+        return match.group("base"), match.group("month")
+    return calendar_name, None
+
+@dataclass
+class CalendarSize:
+    ics_bytes: int
+    gzip_bytes: int
+
+    @property
+    def reduction(self) -> float:
+        if not self.ics_bytes:
+            return 0.0
+        return 1 - self.gzip_bytes / self.ics_bytes
+
+
+class SerializedCalendar:
+    __slots__ = ("content",)
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def to_ical(self) -> bytes:
+        return self.content
+
+
+class AssembledCalendar(Calendar):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunks: List[bytes] = []
+
+    def to_ical(self, sorted: bool = True) -> bytes:
+        end = b"END:VCALENDAR\r\n"
+        shell = super().to_ical(sorted=sorted)
+        return shell[:-len(end)] + b"".join(self.chunks) + end
+
+
+def _build_calendar(
+    lessons: List[Lesson],
+    enrichment: Optional[Enrichment] = None,
+    store: Optional[LessonStore] = None
+) -> bytes:
+    generator = CalendarsGenerator(data_path=None, enrichment=enrichment, store=store)
+    generator._build(lessons)
+    (cal,) = generator.calendars.values()
+    return cal.to_ical()
+
+
 class CalendarsGenerator:
-    def __init__(self, data_path: Path):
+    def __init__(
+        self,
+        data_path: Optional[Path],
+        name_suffix: str = "",
+        today: Optional[date] = None,
+        enrichment: Optional[Enrichment] = None,
+        store: Optional[LessonStore] = None,
+        generation: Optional[GenerationWriter] = None
+    ):
         self.calendars: Dict[str, Calendar] = {}
         self.data_path = data_path
-        self.moscow_tz = pytz.timezone("Europe/Moscow")
-
-    def _make_event(self, date_str: str, lesson: Dict[str, Any]) -> Event:
-        event = Event()
-        lesson_type = lesson.get("work_type")
-        lesson_type_id = lesson.get("work_type_id")
-        lesson_format = lesson.get("format", None)
-        subject = lesson.get("subject")
-        time_start = lesson.get("time_start")
-        time_end = lesson.get("time_end")
-        teacher = lesson.get("teacher_name", None)
-        teacher_id = lesson.get("teacher_id", None)
-        room = lesson.get("room", None)
-        building = lesson.get("building", None)
-        group = lesson.get("group", None)
-        note = lesson.get("note", None)
-        zoom_url = lesson.get("zoom_url", None)
-        zoom_password = lesson.get("zoom_password", None)
-        zoom_info = lesson.get("zoom_info", None)
-        pair_id = lesson.get("pair_id")
-        color = calendar_generator_config.COLORS.get(lesson_type_id)
-
-        calendar_name = f"ITMO {lesson_type}"
-
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-        if time_start and time_end:
-            start_time = datetime.strptime(time_start, "%H:%M").time()
-            end_time = datetime.strptime(time_end, "%H:%M").time()
+        self.enrichment = enrichment or Enrichment()
+        self.store = store
+        self.generation = generation
+        self.name_suffix = name_suffix
+        self.today = today or date.today()
+        self.moscow_tz = pytz.timezone(calendar_generator_config.TIMEZONE)
+        self.profile = calendar_generator_config.OUTPUT_PROFILE
+        self.sizes: Dict[str, CalendarSize] = {}
+        self._date_range: Dict[str, List[date]] = {}
 
+    def _event_times(self, lesson: Lesson) -> Tuple[datetime, datetime]:
+        date_obj = lesson.date
+        if lesson.time_start and lesson.time_end:
             start_dt = self.moscow_tz.localize(
-                datetime.combine(date_obj, start_time)
+                datetime.combine(date_obj, lesson.time_start)
             )
             end_dt = self.moscow_tz.localize(
-                datetime.combine(date_obj, end_time)
+                datetime.combine(date_obj, lesson.time_end)
             )
         else:
             start_dt = self.moscow_tz.localize(
@@ -57,79 +122,333 @@ class CalendarsGenerator:
             end_dt = self.moscow_tz.localize(
                 datetime.combine(date_obj, datetime.max.time())
             ) - timedelta(seconds=1)
+        return start_dt, end_dt
+
+    def _ensure_calendar(self, lesson: Lesson) -> Calendar:
+        calendar_name = self.calendar_name(lesson)
+        date_obj = lesson.date
 
         if calendar_name not in self.calendars:
-            cal = Calendar()
-            cal.add("prodid", "-//Schedule//")
-            cal.add("version", "2.0")
-            cal.add("name", calendar_name)
-            cal.add("X-WR-CALNAME", calendar_name)
-            cal.add("timezone", "Europe/Moscow")
-            cal.add("X-APPLE-CALENDAR-COLOR", color)
-            self.calendars[calendar_name] = cal
+            color = calendar_generator_config.COLORS.get(lesson.work_type_id)
+            self.calendars[calendar_name] = self._make_calendar(calendar_name, color)
+            self._date_range[calendar_name] = [date_obj, date_obj]
+        else:
+            date_range = self._date_range[calendar_name]
+            date_range[0] = min(date_range[0], date_obj)
+            date_range[1] = max(date_range[1], date_obj)
+        return self.calendars[calendar_name]
+
+    def _build_event(self, lesson: Lesson) -> Event:
+        event = Event()
+        start_dt, end_dt = self._event_times(lesson)
+
+        event.add("summary", f"{lesson.subject} - {lesson.work_type}")
 
-        event.add("summary", f"{subject} - {lesson_type}")
+        teacher = self.enrichment.teachers.get(lesson.teacher_id)
+        building = self.enrichment.buildings.get(lesson.building)
 
         description_parts = []
-        if teacher:
-            description_parts.append(f"Преподаватель: {teacher_id} {teacher}")
-        if group:
-            description_parts.append(f"Группа: {group}")
-        if lesson_format:
-            description_parts.append(f"Формат: {lesson_format}")
-        if zoom_password:
-            description_parts.append(f"Zoom Пароль: {zoom_password}")
-        if zoom_info:
-            description_parts.append(f"Zoom Информация: {zoom_info}")
-        if note:
-            description_parts.append(f"Примечание: {note}")
-
-        event.add("description", "\n".join(description_parts))
+        if lesson.teacher_name:
+            description_parts.append(f"Преподаватель: {lesson.teacher_id} {lesson.teacher_name}")
+        if teacher and teacher.profile_url:
+            description_parts.append(f"Профиль преподавателя: {teacher.profile_url}")
+        if building and building.address:
+            description_parts.append(f"Адрес: {building.address}")
+        if lesson.group:
+            description_parts.append(f"Группа: {lesson.group}")
+        if lesson.format:
+            description_parts.append(f"Формат: {lesson.format}")
+        if lesson.zoom_password:
+            description_parts.append(f"Zoom Пароль: {lesson.zoom_password}")
+        if lesson.zoom_info:
+            description_parts.append(f"Zoom Информация: {lesson.zoom_info}")
+        if lesson.note:
+            description_parts.append(f"Примечание: {lesson.note}")
+
+        if description_parts or self.profile == OutputProfile.FULL:
+            event.add("description", "\n".join(description_parts))
         event.add("dtstart", start_dt)
         event.add("dtend", end_dt)
-        event.add("uid", f"{pair_id}@my.itmo.ru")
+        event.add("uid", f"{lesson.pair_id}@my.itmo.ru")
 
         location_parts = []
-        if building or room:
-            if building:
-                location_parts.append(building)
-            if room:
-                location_parts.append(f"ауд. {room}")
-            if zoom_url:
-                event.add("url", zoom_url)
-        elif zoom_url:
-            location_parts.append(zoom_url)
+        if lesson.building or lesson.room:
+            if lesson.building:
+                location_parts.append(lesson.building)
+            if lesson.room:
+                location_parts.append(f"ауд. {lesson.room}")
+            if lesson.zoom_url:
+                event.add("url", lesson.zoom_url)
+        elif lesson.zoom_url:
+            location_parts.append(lesson.zoom_url)
 
         if location_parts:
             event.add("location", ", ".join(location_parts))
+        if building and building.latitude is not None and building.longitude is not None:
+            event.add("geo", (building.latitude, building.longitude))
+
+        return event
 
-        self.calendars[calendar_name].add_component(event)
+    def _make_event(self, lesson: Lesson) -> Event:
+        cal = self._ensure_calendar(lesson)
+        event = self._build_event(lesson)
+        cal.add_component(event)
         return event
 
-    def _load_data(self) -> Dict[str, Any]:
+    def _ensure_series(self, series: Series) -> Calendar:
+        cal = self._ensure_calendar(series.lessons[0])
+        for lesson in series.lessons[1:]:
+            self._ensure_calendar(lesson)
+        return cal
+
+    def _series_events(self, series: Series) -> List[Event]:
+        first = series.lessons[0]
+        master = self._build_event(first)
+        uid = f"{series.uid}@my.itmo.ru"
+        master["uid"] = vText(uid)
+        master.add("rrule", {"freq": "weekly", "interval": series.interval, "count": series.count})
+        for exdate in series.exdates:
+            master.add("exdate", self._event_times(replace(first, date=exdate))[0])
+        events = [master]
+
+        master_signature = event_signature(master)
+        for lesson in series.lessons[1:]:
+            occurrence = self._build_event(lesson)
+            if event_signature(occurrence) == master_signature:
+                continue
+            occurrence["uid"] = vText(uid)
+            occurrence.add("recurrence-id", self._event_times(lesson)[0])
+            events.append(occurrence)
+        return events
+
+    def _make_series(self, series: Series) -> Event:
+        cal = self._ensure_series(series)
+        events = self._series_events(series)
+        for event in events:
+            cal.add_component(event)
+        return events[0]
+
+    def _lesson_fingerprint(self, lesson: Lesson) -> str:
+        return repr((
+            lesson.date.isoformat(),
+            lesson.to_row(),
+            self.enrichment.teachers.get(lesson.teacher_id),
+            self.enrichment.buildings.get(lesson.building)
+        ))
+
+    def _unit_key(self, item: Union[Series, Lesson]) -> str:
+        if isinstance(item, Series):
+            pair_id = item.uid
+            parts = [
+                str(item.interval),
+                str(item.count),
+                *(exdate.isoformat() for exdate in item.exdates),
+                *(self._lesson_fingerprint(lesson) for lesson in item.lessons)
+            ]
+        else:
+            pair_id = item.pair_id
+            parts = [self._lesson_fingerprint(item)]
+        return event_key(pair_id, hash_parts(self.profile.name, calendar_generator_config.TIMEZONE, *parts))
+
+    def _assemble(self, items: List[Union[Series, Lesson]]) -> None:
+        keyed = [(item, self._unit_key(item)) for item in items]
+        chunks = self.store.get_many(key for _, key in keyed)
+        built: Dict[str, bytes] = {}
+
+        for item, key in keyed:
+            if isinstance(item, Series):
+                cal = self._ensure_series(item)
+            else:
+                cal = self._ensure_calendar(item)
+            if key not in chunks:
+                events = self._series_events(item) if isinstance(item, Series) else [self._build_event(item)]
+                chunks[key] = built[key] = b"".join(event.to_ical() for event in events)
+            cal.chunks.append(chunks[key])
+
+        self.store.put_many(built)
+
+    def _make_calendar(self, calendar_name: str, color: str) -> Calendar:
+        cal = Calendar() if self.store is None else AssembledCalendar()
+        cal.add("prodid", "-//Schedule//")
+        cal.add("version", "2.0")
+        if self.profile == OutputProfile.FULL:
+            cal.add("name", calendar_name)
+        cal.add("X-WR-CALNAME", calendar_name)
+        if self.profile == OutputProfile.FULL:
+            cal.add("timezone", calendar_generator_config.TIMEZONE)
+        if color or self.profile == OutputProfile.FULL:
+            cal.add("X-APPLE-CALENDAR-COLOR", color)
+        return cal
+
+    def _add_timezones(self) -> None:
+        for calendar_name, cal in self.calendars.items():
+            first_date, last_date = self._date_range[calendar_name]
+            timezone = Timezone.from_tzid(
+                calendar_generator_config.TIMEZONE,
+                first_date=first_date,
+                last_date=last_date + timedelta(days=1)
+            )
+            timezone.pop("COMMENT", None)
+            cal.subcomponents.insert(0, timezone)
+
+    def _load_data(self) -> Schedule:
         with open(self.data_path, 'r', encoding="utf-8") as f:
-            data = json.load(f)
+            data = decode_schedule(json.load(f))
         return data
         
-    def generate(self) -> Dict[str, Calendar]:
-        data = self._load_data()
+    def calendar_name(self, lesson: Lesson) -> str:
+        return f"ITMO {lesson.work_type}{self.name_suffix}"
+
+    def _build(self, lessons: Iterable[Lesson]) -> None:
+        if calendar_generator_config.RECURRENCE:
+            items = detect_series(lessons, self.calendar_name)
+        else:
+            items = list(lessons)
+
+        if self.store is not None:
+            self._assemble(items)
+        else:
+            for item in items:
+                if isinstance(item, Series):
+                    self._make_series(item)
+                else:
+                    self._make_event(item)
+
+        if self.profile == OutputProfile.COMPACT:
+            self._add_timezones()
+
+    def _shards(self, data: Schedule) -> Dict[str, List[Lesson]]:
+        shards: Dict[str, List[Lesson]] = {}
+        for lessons in data.values():
+            for lesson in lessons:
+                shards.setdefault(self.calendar_name(lesson), []).append(lesson)
+        return shards
+
+    def generate(self, data: Optional[Schedule] = None) -> Dict[str, Calendar]:
+        if data is None:
+            data = self._load_data()
         logger.info("Calendar generator started")
-        for date_str, lessons in data.items():
+        if calendar_generator_config.PARALLEL:
+            return self.generate_parallel(data)
+
+        self._build(lesson for lessons in data.values() for lesson in lessons)
+        self._build_variants(data)
+
+        logger.info("Calendar generator finished")
+        return self.calendars
+
+    def _build_variant(self, name_suffix: str, lessons: List[Lesson]) -> int:
+        generator = CalendarsGenerator(
+            data_path=None,
+            name_suffix=name_suffix,
+            today=self.today,
+            enrichment=self.enrichment,
+            store=self.store
+        )
+        generator._build(lessons)
+        self.calendars.update(generator.calendars)
+        return len(generator.calendars)
+
+    def _build_variants(self, data: Schedule) -> None:
+        lessons = [lesson for day_lessons in data.values() for lesson in day_lessons]
+
+        if calendar_generator_config.LIGHT_FEED_WEEKS > 0:
+            start, end = light_window(self.today)
+            window_lessons = [lesson for lesson in lessons if start <= lesson.date < end]
+            count = self._build_variant(calendar_generator_config.LIGHT_FEED_SUFFIX, window_lessons)
+            logger.info("Built %s light feed(s) for %s..%s", count, start, end)
+
+        if calendar_generator_config.MONTHLY_SHARDS:
+            months: Dict[str, List[Lesson]] = {}
             for lesson in lessons:
-                self._make_event(date_str=date_str, lesson=lesson)
+                months.setdefault(lesson.date.strftime("%Y-%m"), []).append(lesson)
+            for month in sorted(months):
+                self._build_variant(f" ({month})", months[month])
+            logger.info("Built monthly shards for %s month(s)", len(months))
+
+    def generate_parallel(self, data: Schedule, max_workers: Optional[int] = None) -> Dict[str, Calendar]:
+        shards = self._shards(data)
+        max_workers = max_workers or calendar_generator_config.MAX_WORKERS
+        logger.info("Generating %s calendar(s) in a process pool", len(shards))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            contents = executor.map(
+                _build_calendar, shards.values(), [self.enrichment] * len(shards), [self.store] * len(shards)
+            )
+            for calendar_name, content in zip(shards, contents):
+                self.calendars[calendar_name] = SerializedCalendar(content)
+        self._build_variants(data)
 
         logger.info("Calendar generator finished")
         return self.calendars
 
+    def calendar_groups(self, data: Optional[Schedule] = None) -> Dict[str, str]:
+        if data is None:
+            data = self._load_data()
+        groups: Dict[str, Set[Optional[str]]] = {}
+        for lessons in data.values():
+            for lesson in lessons:
+                groups.setdefault(self.calendar_name(lesson), set()).add(lesson.group)
 
-    def save(self) -> Dict[str, Path]:
-        calendar_dir = Path(calendar_generator_config.CALENDAR_DIR)
-        calendar_dir.mkdir(parents=True, exist_ok=True)
-        calendar_paths = {}
+        result = {}
+        for calendar_name in self.calendars:
+            members = groups.get(split_feed_name(calendar_name)[0], set())
+            if len(members) == 1 and None not in members:
+                result[calendar_name] = next(iter(members))
+        return result
 
-        for calendar_name, cal in self.calendars.items():
-            calendar_path = calendar_dir / f"{calendar_name}.ics"
-            calendar_paths[calendar_name] = calendar_path
-            with open(calendar_path, "wb") as f:
-                f.write(cal.to_ical())
+    def calendar_path(self, calendar_name: str) -> Path:
+        return Path(calendar_generator_config.CALENDAR_DIR) / f"{calendar_name}.ics"
+
+    def output_path(self, calendar_name: str) -> Path:
+        calendar_path = self.calendar_path(calendar_name)
+        if self.generation:
+            return self.generation.directory / calendar_path.name
+        return calendar_path
+
+    def _write(self, path: Path, content: bytes) -> None:
+        if self.generation:
+            self.generation.write(path.name, content)
+        else:
+            atomic_write(path, content)
+
+    def save_calendar(self, calendar_name: str) -> Path:
+        calendar_path = self.calendar_path(calendar_name)
+        content = self.calendars[calendar_name].to_ical()
+        self._write(calendar_path, content)
+
+        gzip_size = 0
+        if calendar_generator_config.WRITE_GZIP:
+            compressed = gzip.compress(content, compresslevel=calendar_generator_config.GZIP_LEVEL, mtime=0)
+            self._write(calendar_path.with_name(f"{calendar_path.name}.gz"), compressed)
+            gzip_size = len(compressed)
+
+        self.sizes[calendar_name] = CalendarSize(ics_bytes=len(content), gzip_bytes=gzip_size)
+        return calendar_path
+
+    def publish(self) -> Dict[str, Path]:
+        calendar_paths = {calendar_name: self.calendar_path(calendar_name) for calendar_name in self.calendars}
+        if self.generation:
+            self.generation.publish(
+                file_name
+                for calendar_path in calendar_paths.values()
+                for file_name in (calendar_path.name, f"{calendar_path.name}.gz")
+            )
         return calendar_paths
+
+    def save(self) -> Dict[str, Path]:
+        for calendar_name in self.calendars:
+            self.save_calendar(calendar_name)
+        return self.publish()
+
+    def load_saved(self, calendar_paths: Dict[str, Path]) -> Dict[str, Calendar]:
+        for calendar_name, calendar_path in calendar_paths.items():
+            content = Path(calendar_path).read_bytes()
+            self.calendars[calendar_name] = Calendar.from_ical(content)
+
+            gzip_path = Path(calendar_path).with_name(f"{Path(calendar_path).name}.gz")
+            gzip_size = gzip_path.stat().st_size if gzip_path.exists() else 0
+            self.sizes[calendar_name] = CalendarSize(ics_bytes=len(content), gzip_bytes=gzip_size)
+
+        logger.info("Loaded %s previously generated calendar(s)", len(calendar_paths))
+        return self.calendars
@@ -0,0 +1,41 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict
+
+_EVENT_PATTERN = re.compile(rb"BEGIN:VEVENT\r\n.*?END:VEVENT\r\n", re.S)
+_IDENTITY_PATTERN = re.compile(rb"^(?:UID|RECURRENCE-ID)[;:][^\r\n]*", re.M)
+
+
+@dataclass
+class CalendarChanges:
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+    unchanged: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def event_fingerprints(content: bytes) -> Dict[bytes, str]:
+    fingerprints = {}
+    for match in _EVENT_PATTERN.finditer(content):
+        event = match.group(0)
+        identity = b"|".join(_IDENTITY_PATTERN.findall(event))
+        fingerprints[identity] = hashlib.sha1(event).hexdigest()
+    return fingerprints
+
+
+def diff_calendars(previous: bytes, current: bytes) -> CalendarChanges:
+    before = event_fingerprints(previous)
+    after = event_fingerprints(current)
+    changes = CalendarChanges(removed=len(before.keys() - after.keys()))
+    for identity, fingerprint in after.items():
+        if identity not in before:
+            changes.added += 1
+        elif before[identity] != fingerprint:
+            changes.changed += 1
+        else:
+            changes.unchanged += 1
+    return changes
@@ -0,0 +1,139 @@
+import logging
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+from config.calendar_generator import calendar_generator_config
+
+logger = logging.getLogger(__name__)
+
+CURRENT_LINK = "current"
+
+
+def _relative_symlink(target: Path, link: Path) -> None:
+    staging_link = link.with_name(f".{link.name}.{uuid.uuid4().hex[:8]}")
+    os.symlink(os.path.relpath(target, link.parent), staging_link)
+    os.replace(staging_link, link)
+
+
+def _fsync_write(path: Path, content: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class GenerationWriter:
+    def __init__(self, calendars_dir: Optional[Path] = None, keep: Optional[int] = None):
+        self.calendars_dir = Path(calendars_dir or calendar_generator_config.CALENDAR_DIR)
+        self.root = self.calendars_dir.with_name(
+            f"{self.calendars_dir.name}{calendar_generator_config.GENERATIONS_SUFFIX}"
+        )
+        self.current_link = self.root / CURRENT_LINK
+        self.keep = max(keep or calendar_generator_config.KEEP_GENERATIONS, 1)
+        self.generation_id = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        self.directory = self.root / self.generation_id
+        self.previous = self._previous_directory()
+        self.written = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def _previous_directory(self) -> Optional[Path]:
+        if self.current_link.is_symlink() and self.current_link.exists():
+            return self.current_link.resolve()
+        if self.calendars_dir.is_dir() and not self.calendars_dir.is_symlink():
+            return self.calendars_dir
+        return None
+
+    def _reuse(self, file_name: str, target: Path) -> bool:
+        if self.previous is None:
+            return False
+        source = self.previous / file_name
+        if not source.is_file():
+            return False
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+        return True
+
+    def write(self, file_name: str, content: bytes) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / file_name
+        previous = self.previous / file_name if self.previous else None
+
+        unchanged = (
+            previous is not None and previous.is_file()
+            and previous.stat().st_size == len(content) and previous.read_bytes() == content
+        )
+        if unchanged and self._reuse(file_name, target):
+            with self._lock:
+                self.reused += 1
+        else:
+            _fsync_write(target, content)
+            with self._lock:
+                self.written += 1
+        return target
+
+    def _carry_over(self, file_names: Iterable[str]) -> None:
+        for file_name in file_names:
+            target = self.directory / file_name
+            if not target.exists() and self._reuse(file_name, target):
+                self.reused += 1
+
+    def _migrate_legacy_directory(self) -> None:
+        if not self.calendars_dir.is_dir() or self.calendars_dir.is_symlink():
+            return
+        legacy = self.root / f"{self.generation_id}-legacy"
+        os.rename(self.calendars_dir, legacy)
+        logger.info("Moved the legacy calendar directory to %s", legacy)
+
+    def _previous_file_names(self) -> Set[str]:
+        if self.previous is None:
+            return set()
+        return {path.name for path in self.previous.iterdir() if path.is_file()}
+
+    def publish(self, file_names: Iterable[str]) -> bool:
+        file_names = list(file_names)
+        if (
+            self.written == 0 and self.previous is not None and self.calendars_dir.is_symlink()
+            and set(file_names) == self._previous_file_names()
+        ):
+            shutil.rmtree(self.directory, ignore_errors=True)
+            logger.info("Every calendar is unchanged, keeping generation %s", self.previous.name)
+            return False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._carry_over(file_names)
+        _relative_symlink(self.directory, self.current_link)
+        self._migrate_legacy_directory()
+        if not self.calendars_dir.is_symlink():
+            _relative_symlink(self.current_link, self.calendars_dir)
+
+        logger.info(
+            "Published generation %s: %s file(s) written, %s hardlinked from the previous generation",
+            self.generation_id, self.written, self.reused
+        )
+        self.collect()
+        return True
+
+    def generations(self) -> List[Path]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            (path for path in self.root.iterdir() if path.is_dir() and not path.is_symlink()),
+            key=lambda path: path.name
+        )
+
+    def collect(self) -> int:
+        current = self.current_link.resolve() if self.current_link.exists() else None
+        expired = [path for path in self.generations()[:-self.keep] if path != current]
+        for path in expired:
+            shutil.rmtree(path, ignore_errors=True)
+        if expired:
+            logger.info("Removed %s old calendar generation(s)", len(expired))
+        return len(expired)
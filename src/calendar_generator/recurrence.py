@@ -0,0 +1,89 @@
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from math import gcd
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from icalendar import Event
+
+from src.schedule_parser.lesson import Lesson
+
+MIN_OCCURRENCES = 2
+
+_VOLATILE_PROPERTIES = ("DTSTART", "DTEND", "UID", "RRULE", "EXDATE", "RECURRENCE-ID")
+
+
+@dataclass
+class Series:
+    uid: str
+    lessons: List[Lesson]
+    interval: int
+    count: int
+    exdates: List[date] = field(default_factory=list)
+
+
+def event_signature(event: Event) -> Tuple[str, ...]:
+    return tuple(
+        line for line in event.content_lines()
+        if line and line.split(":", 1)[0].split(";", 1)[0] not in _VOLATILE_PROPERTIES
+    )
+
+
+def _series_key(lesson: Lesson, calendar_name: str) -> Tuple:
+    return (
+        calendar_name,
+        lesson.subject,
+        lesson.work_type,
+        lesson.date.weekday(),
+        lesson.time_start,
+        lesson.time_end,
+        lesson.room,
+        lesson.teacher_name
+    )
+
+
+def _make_series(key: Tuple, lessons: List[Lesson]) -> Series:
+    first = lessons[0].date
+    week_offsets = [(lesson.date - first).days // 7 for lesson in lessons]
+
+    interval = 0
+    for offset in week_offsets[1:]:
+        interval = gcd(interval, offset)
+
+    count = week_offsets[-1] // interval + 1
+    occurring = set(week_offsets)
+    exdates = [
+        first + timedelta(weeks=step * interval)
+        for step in range(count)
+        if step * interval not in occurring
+    ]
+
+    uid = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return Series(uid=f"series-{uid}", lessons=lessons, interval=interval, count=count, exdates=exdates)
+
+
+def detect_series(
+    lessons: Iterable[Lesson],
+    calendar_name: Callable[[Lesson], str]
+) -> List[Union[Series, Lesson]]:
+    groups: Dict[Tuple, List[Lesson]] = {}
+    for lesson in lessons:
+        groups.setdefault(_series_key(lesson, calendar_name(lesson)), []).append(lesson)
+
+    result: List[Union[Series, Lesson]] = []
+    for key, group in groups.items():
+        group.sort(key=lambda lesson: lesson.date)
+
+        unique: List[Lesson] = []
+        for lesson in group:
+            if unique and unique[-1].date == lesson.date:
+                result.append(lesson)
+            else:
+                unique.append(lesson)
+
+        if len(unique) < MIN_OCCURRENCES:
+            result.extend(unique)
+        else:
+            result.append(_make_series(key, unique))
+
+    return result
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from config.checkpoints import checkpoint_config
+from config.schedule_parser.cache import cache_config
+from src.storage import LockTimeoutError, atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+def hash_parts(*parts: Union[bytes, str]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_file(path: Union[str, Path]) -> Optional[str]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    return hash_parts(path.read_bytes())
+
+
+class RunInProgressError(Exception):
+    pass
+
+
+class CheckpointStore:
+    def __init__(self):
+        cache_dir = Path(cache_config.CACHE_DIR)
+        self.path = cache_dir / checkpoint_config.CHECKPOINT_FILE
+        self.lock_path = cache_dir / checkpoint_config.RUN_LOCK_FILE
+        self._lock = threading.Lock()
+        self.state: Dict[str, Any] = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return {"run": {}, "steps": {}}
+
+        try:
+            with open(self.path, 'r', encoding="utf-8") as f:
+                state = json.load(f)
+            state.setdefault("run", {})
+            state.setdefault("steps", {})
+            return state
+        except (json.JSONDecodeError, OSError, AttributeError) as e:
+            logger.warning("Checkpoint file is unreadable, starting from scratch: %s", e)
+            return {"run": {}, "steps": {}}
+
+    def _save(self) -> None:
+        atomic_write(self.path, json.dumps(self.state, ensure_ascii=False, indent=2))
+
+    @contextmanager
+    def run_lock(self) -> Iterator[None]:
+        try:
+            with file_lock(self.lock_path, timeout=checkpoint_config.RUN_LOCK_TIMEOUT):
+                yield
+        except LockTimeoutError as e:
+            raise RunInProgressError("Another run holds the run lock") from e
+
+    def begin_run(self) -> bool:
+        with self._lock:
+            run = self.state["run"]
+            resuming = run.get("status") == "running"
+            if not resuming:
+                self._drop_run_scoped()
+                self.state["run"] = {"id": uuid.uuid4().hex, "status": "running", "started_at": time.time()}
+            self._save()
+
+        if resuming:
+            logger.info("Resuming unfinished run %s", run.get("id"))
+        return resuming
+
+    def finish_run(self) -> None:
+        with self._lock:
+            self._drop_run_scoped()
+            self.state["run"]["status"] = "finished"
+            self.state["run"]["finished_at"] = time.time()
+            self._save()
+
+    def _drop_run_scoped(self) -> None:
+        self.state["steps"] = {
+            step: checkpoint for step, checkpoint in self.state["steps"].items()
+            if not checkpoint.get("run_scoped")
+        }
+
+    def run_id(self) -> str:
+        with self._lock:
+            return self.state["run"].get("id", "")
+
+    def has_steps(self, prefix: str) -> bool:
+        with self._lock:
+            return any(step.startswith(prefix) for step in self.state["steps"])
+
+    def get(self, step: str, input_hash: str) -> Optional[Any]:
+        with self._lock:
+            checkpoint = self.state["steps"].get(step)
+        if checkpoint and checkpoint.get("input_hash") == input_hash:
+            logger.info("Checkpoint hit for step %s", step)
+            return checkpoint.get("output")
+        return None
+
+    def complete(self, step: str, input_hash: str, output: Any = None, run_scoped: bool = False) -> None:
+        with self._lock:
+            self.state["steps"][step] = {
+                "input_hash": input_hash,
+                "output": output,
+                "completed_at": time.time(),
+                "run_scoped": run_scoped
+            }
+            self._save()
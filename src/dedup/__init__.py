@@ -0,0 +1,142 @@
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from config.dedup import dedup_config
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    key TEXT PRIMARY KEY,
+    pair_id TEXT,
+    content BLOB NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_used ON events (used_at);
+DROP TABLE IF EXISTS publications;
+CREATE TABLE IF NOT EXISTS group_publications (
+    backend TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    calendar_name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    link TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (backend, group_name, calendar_name)
+);
+"""
+
+_QUERY_BATCH = 500
+_TOUCH_INTERVAL = 3600
+
+
+def event_key(pair_id: object, content_hash: str) -> str:
+    return f"{pair_id}:{content_hash}"
+
+
+def _batches(values: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class LessonStore:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or dedup_config.STORE_FILE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self._memory: Dict[str, bytes] = {}
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=dedup_config.BUSY_TIMEOUT, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            yield connection
+        finally:
+            connection.close()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(dict.fromkeys(keys))
+        found = {key: self._memory[key] for key in keys if key in self._memory}
+        missing = [key for key in keys if key not in found]
+
+        if missing:
+            now = time.time()
+            with self._connect() as connection:
+                for batch in _batches(missing, _QUERY_BATCH):
+                    placeholders = ",".join("?" * len(batch))
+                    rows = connection.execute(
+                        f"SELECT key, content FROM events WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                    for key, content in rows:
+                        found[key] = self._memory.setdefault(key, bytes(content))
+                    connection.execute(
+                        f"UPDATE events SET used_at = ? WHERE key IN ({placeholders}) AND used_at < ?",
+                        (now, *batch, now - _TOUCH_INTERVAL)
+                    )
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[str, bytes]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        for key, content in entries.items():
+            self._memory.setdefault(key, content)
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT OR IGNORE INTO events (key, pair_id, content, used_at) VALUES (?, ?, ?, ?)",
+                [(key, key.split(":", 1)[0], content, now) for key, content in entries.items()]
+            )
+            connection.execute("COMMIT")
+        self.stored += len(entries)
+
+    def group_link(self, backend: str, group_name: str, calendar_name: str, content_hash: str) -> Optional[str]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT link FROM group_publications "
+                "WHERE backend = ? AND group_name = ? AND calendar_name = ? AND content_hash = ?",
+                (backend, group_name, calendar_name, content_hash)
+            ).fetchone()
+            if row:
+                connection.execute(
+                    "UPDATE group_publications SET used_at = ? WHERE backend = ? AND group_name = ? AND calendar_name = ?",
+                    (time.time(), backend, group_name, calendar_name)
+                )
+        return row[0] if row else None
+
+    def record_group_publication(
+        self,
+        backend: str,
+        group_name: str,
+        calendar_name: str,
+        content_hash: str,
+        link: str
+    ) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO group_publications "
+                "(backend, group_name, calendar_name, content_hash, link, used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (backend, group_name, calendar_name, content_hash, link, time.time())
+            )
+
+    def prune(self, max_age: Optional[int] = None) -> int:
+        cutoff = time.time() - (max_age or dedup_config.MAX_AGE)
+        with self._connect() as connection:
+            events = connection.execute("DELETE FROM events WHERE used_at < ?", (cutoff,)).rowcount
+            groups = connection.execute("DELETE FROM group_publications WHERE used_at < ?", (cutoff,)).rowcount
+        if events or groups:
+            logger.info(
+                "Pruned %s unused event(s) and %s group publication(s) from the lesson store", events, groups
+            )
+        return events
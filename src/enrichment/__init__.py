@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence
+
+from config.enrichment import enrichment_config
+from src.schedule_parser.lesson import Lesson
+from src.storage import atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class TeacherInfo:
+    teacher_id: int
+    profile_url: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class BuildingInfo:
+    name: str
+    address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+@dataclass
+class Enrichment:
+    teachers: Dict[int, TeacherInfo] = field(default_factory=dict)
+    buildings: Dict[str, BuildingInfo] = field(default_factory=dict)
+
+    def fingerprint(self) -> str:
+        payload = {
+            "teachers": {str(key): asdict(value) for key, value in sorted(self.teachers.items())},
+            "buildings": {key: asdict(value) for key, value in sorted(self.buildings.items())}
+        }
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class MetadataResolver(Protocol):
+    name: str
+
+    def fingerprint(self) -> str:
+        ...
+
+    def resolve_teachers(self, teacher_ids: Sequence[int]) -> Dict[int, Optional[TeacherInfo]]:
+        ...
+
+    def resolve_buildings(self, buildings: Sequence[str]) -> Dict[str, Optional[BuildingInfo]]:
+        ...
+
+
+ResolverFactory = Callable[[], MetadataResolver]
+
+_registry: Dict[str, ResolverFactory] = {}
+
+
+def register_resolver(name: str, factory: ResolverFactory) -> None:
+    _registry[name] = factory
+
+
+def create_resolver(name: str) -> MetadataResolver:
+    if name not in _registry:
+        raise ValueError(f"Unknown metadata resolver: {name}")
+    return _registry[name]()
+
+
+def _batches(values: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class MetadataCache:
+    KINDS = ("teachers", "buildings")
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or enrichment_config.CACHE_FILE)
+        self.lock_path = Path(enrichment_config.LOCK_FILE)
+        self.ttl = {"teachers": enrichment_config.TEACHER_TTL, "buildings": enrichment_config.BUILDING_TTL}
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind in self.KINDS}
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Enrichment cache read error, starting empty: %s", e)
+            return
+
+        now = time.time()
+        evicted = 0
+        for kind in self.KINDS:
+            for key, entry in stored.get(kind, {}).items():
+                if now - entry.get("resolved_at", 0) < self.ttl[kind]:
+                    self.entries[kind][key] = entry
+                else:
+                    evicted += 1
+        if evicted:
+            logger.info("Evicted %s expired enrichment entr(ies)", evicted)
+
+    def save(self) -> None:
+        with file_lock(self.lock_path, timeout=enrichment_config.LOCK_TIMEOUT):
+            atomic_write(self.path, json.dumps(self.entries, ensure_ascii=False, separators=(",", ":")))
+
+    def get(self, kind: str, key: str, source: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries[kind].get(key)
+        if entry is None or entry.get("source") != source:
+            return None
+        return entry
+
+    def put(self, kind: str, key: str, value: Optional[Dict[str, Any]], source: str) -> None:
+        self.entries[kind][key] = {"value": value, "source": source, "resolved_at": time.time()}
+
+
+class Enricher:
+    def __init__(self, resolver: MetadataResolver, cache: Optional[MetadataCache] = None):
+        self.resolver = resolver
+        self.cache = cache or MetadataCache()
+        self.source = f"{resolver.name}:{resolver.fingerprint()}"
+
+    def _resolve(
+        self,
+        kind: str,
+        keys: List[Any],
+        resolve: Callable[[Sequence[Any]], Dict[Any, Optional[Any]]]
+    ) -> int:
+        missing = [key for key in keys if self.cache.get(kind, str(key), self.source) is None]
+        for batch in _batches(missing, enrichment_config.BATCH_SIZE):
+            try:
+                results = resolve(batch)
+            except Exception as e:
+                logger.warning("Resolver '%s' failed for %s %s: %s", self.resolver.name, len(batch), kind, e)
+                continue
+            unanswered = 0
+            for key in batch:
+                if key not in results:
+                    unanswered += 1
+                    continue
+                value = results[key]
+                self.cache.put(kind, str(key), asdict(value) if value else None, self.source)
+            if unanswered:
+                logger.warning(
+                    "Resolver '%s' could not answer %s %s, they will be retried next run",
+                    self.resolver.name, unanswered, kind
+                )
+        return len(missing)
+
+    def enrich(self, lessons: Iterable[Lesson]) -> Enrichment:
+        teacher_ids = set()
+        buildings = set()
+        for lesson in lessons:
+            if lesson.teacher_id is not None:
+                teacher_ids.add(lesson.teacher_id)
+            if lesson.building:
+                buildings.add(lesson.building)
+
+        self.cache.load()
+        looked_up = self._resolve("teachers", sorted(teacher_ids), self.resolver.resolve_teachers)
+        looked_up += self._resolve("buildings", sorted(buildings), self.resolver.resolve_buildings)
+        if looked_up:
+            self.cache.save()
+
+        enrichment = Enrichment()
+        for teacher_id in teacher_ids:
+            entry = self.cache.get("teachers", str(teacher_id), self.source)
+            if entry and entry["value"]:
+                enrichment.teachers[teacher_id] = TeacherInfo(**entry["value"])
+        for building in buildings:
+            entry = self.cache.get("buildings", building, self.source)
+            if entry and entry["value"]:
+                enrichment.buildings[building] = BuildingInfo(**entry["value"])
+
+        logger.info(
+            "Enriched %s teacher(s) and %s building(s), %s looked up via '%s'",
+            len(enrichment.teachers), len(enrichment.buildings), looked_up, self.resolver.name
+        )
+        return enrichment
+
+
+def _static() -> MetadataResolver:
+    from src.enrichment.resolvers import StaticResolver
+    return StaticResolver()
+
+
+def _nominatim() -> MetadataResolver:
+    from src.enrichment.resolvers import NominatimResolver
+    return NominatimResolver()
+
+
+register_resolver("static", _static)
+register_resolver("nominatim", _nominatim)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+
+from config.enrichment import enrichment_config
+from src.enrichment import BuildingInfo, TeacherInfo
+from src.transport import create_session
+
+logger = logging.getLogger(__name__)
+
+class StaticResolver:
+    name = "static"
+
+    def _settings(self) -> List[Any]:
+        return [enrichment_config.TEACHER_PROFILE_URL, enrichment_config.BUILDINGS]
+
+    def fingerprint(self) -> str:
+        payload = json.dumps(self._settings(), ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def resolve_teachers(self, teacher_ids: Sequence[int]) -> Dict[int, Optional[TeacherInfo]]:
+        return {
+            teacher_id: TeacherInfo(
+                teacher_id=teacher_id,
+                profile_url=enrichment_config.TEACHER_PROFILE_URL.format(teacher_id=teacher_id)
+            )
+            for teacher_id in teacher_ids
+        }
+
+    def resolve_buildings(self, buildings: Sequence[str]) -> Dict[str, Optional[BuildingInfo]]:
+        result: Dict[str, Optional[BuildingInfo]] = {}
+        for building in buildings:
+            known = enrichment_config.BUILDINGS.get(building)
+            if known:
+                address, latitude, longitude = known
+                result[building] = BuildingInfo(name=building, address=address, latitude=latitude, longitude=longitude)
+            else:
+                result[building] = None
+        return result
+
+
+class NominatimResolver(StaticResolver):
+    name = "nominatim"
+
+    def __init__(self):
+        self.session = create_session()
+        self.session.headers.update({"User-Agent": enrichment_config.NOMINATIM_USER_AGENT})
+        self._last_request = 0.0
+
+    def _settings(self) -> List[Any]:
+        return [*super()._settings(), enrichment_config.NOMINATIM_URL, enrichment_config.NOMINATIM_CITY]
+
+    def _geocode(self, building: str) -> Optional[BuildingInfo]:
+        wait = enrichment_config.NOMINATIM_INTERVAL - (time.monotonic() - self._last_request)
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+        response = self.session.get(enrichment_config.NOMINATIM_URL, params={
+            "q": f"{enrichment_config.NOMINATIM_CITY}, {building}",
+            "format": "jsonv2",
+            "limit": 1
+        }, timeout=enrichment_config.TIMEOUT)
+        response.raise_for_status()
+        places = response.json()
+        if not places:
+            return None
+
+        place = places[0]
+        return BuildingInfo(
+            name=building,
+            address=place.get("display_name"),
+            latitude=float(place["lat"]),
+            longitude=float(place["lon"])
+        )
+
+    def resolve_buildings(self, buildings: Sequence[str]) -> Dict[str, Optional[BuildingInfo]]:
+        result = super().resolve_buildings(buildings)
+        for building in buildings:
+            if result[building] is not None:
+                continue
+            try:
+                result[building] = self._geocode(building)
+            except requests.exceptions.RequestException as e:
+                logger.warning("Geocoding '%s' failed: %s", building, e)
+                del result[building]
+        return result
@@ -0,0 +1,56 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from pathlib import Path
+from typing import Any, Dict
+
+from config.logging import log_config
+
+STRUCTURED_FIELDS = ("stage", "account", "calendar", "duration_ms")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for name in STRUCTURED_FIELDS:
+            entry[name] = getattr(record, name, None)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    log_dir = Path(log_config.LOG_DIR)
+    log_dir.mkdir(exist_ok=True)
+
+    formatter = JsonFormatter() if log_config.JSON_FORMAT else logging.Formatter(log_config.FORMAT)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / log_config.LOG_FILE,
+        maxBytes=log_config.MAX_BYTES,
+        backupCount=log_config.BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(log_config.QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, log_config.LEVEL))
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.profiling import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class StageError(Exception):
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage {stage} failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Task:
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    stage: str = ""
+    priority: int = 0
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[..., Any]] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class CriticalPath:
+    tasks: List[Task] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def busy_time(self) -> float:
+        return sum(task.duration for task in self.tasks)
+
+    def describe(self) -> str:
+        return " -> ".join(f"{task.name} ({task.duration:.2f}s)" for task in self.tasks)
+
+
+class StageGraph:
+    def __init__(self, max_workers: int = 4, profiler: Optional[StageProfiler] = None):
+        self.profiler = profiler or StageProfiler()
+        self.max_workers = 1 if self.profiler.enabled else max_workers
+        self.tasks: Dict[str, Task] = {}
+        self.results: Dict[str, Any] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timed_out: List[str] = []
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        deps: Sequence[str] = (),
+        stage: Optional[str] = None,
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        fallback: Optional[Callable[..., Any]] = None
+    ) -> None:
+        with self._lock:
+            if name in self.tasks:
+                raise ValueError(f"Task {name} is already scheduled")
+            self.tasks[name] = Task(
+                name=name,
+                fn=fn,
+                deps=tuple(deps),
+                stage=stage or name,
+                priority=priority,
+                timeout=timeout,
+                fallback=fallback
+            )
+
+    def _execute(self, task: Task) -> Any:
+        args = [self.results[dep] for dep in task.deps]
+        task.started_at = time.time()
+        try:
+            with self.profiler.stage(task.name):
+                result = task.fn(*args)
+        finally:
+            task.finished_at = time.time()
+
+        logger.info(
+            "Task %s finished in %.2f seconds", task.name, task.duration,
+            extra={"stage": task.stage, "duration_ms": round(task.duration * 1000)}
+        )
+        return result
+
+    def _ready(self, done: set, running: Dict[Future, str]) -> List[Task]:
+        with self._lock:
+            ready = [
+                task for name, task in self.tasks.items()
+                if name not in done and name not in running.values() and all(dep in done for dep in task.deps)
+            ]
+        return sorted(ready, key=lambda task: task.priority)
+
+    def _submit_detached(self, task: Task) -> Future:
+        future: Future = Future()
+
+        def target() -> None:
+            try:
+                future.set_result(self._execute(task))
+            except BaseException as e:
+                future.set_exception(e)
+
+        future.set_running_or_notify_cancel()
+        threading.Thread(target=target, name=f"stage-{task.name}", daemon=True).start()
+        return future
+
+    def _expire(self, running: Dict[Future, str], deadlines: Dict[str, float], done: set) -> None:
+        now = time.time()
+        for future, name in list(running.items()):
+            if name not in deadlines or deadlines[name] > now or future.done():
+                continue
+
+            task = self.tasks[name]
+            del running[future]
+            self.timed_out.append(name)
+            task.finished_at = now
+            if task.fallback is None:
+                raise StageError(name, TimeoutError(f"exceeded its {task.timeout:.0f}s budget"))
+
+            logger.warning(
+                "Task %s exceeded its %.0fs budget, using fallback", name, task.timeout, extra={"stage": task.stage}
+            )
+            self.results[name] = task.fallback(*[self.results[dep] for dep in task.deps])
+            done.add(name)
+
+    def run(self) -> Dict[str, Any]:
+        self.started_at = time.time()
+        done: set = set()
+        running: Dict[Future, str] = {}
+        deadlines: Dict[str, float] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage")
+
+        try:
+            while True:
+                for task in self._ready(done, running):
+                    if self.profiler.enabled and len(running) >= self.max_workers:
+                        break
+                    if task.timeout is None:
+                        running[executor.submit(self._execute, task)] = task.name
+                    else:
+                        deadlines[task.name] = time.time() + task.timeout
+                        running[self._submit_detached(task)] = task.name
+
+                if not running:
+                    break
+
+                pending = [deadlines[name] for name in running.values() if name in deadlines]
+                timeout = max(0.0, min(pending) - time.time()) if pending else None
+                finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not finished:
+                    self._expire(running, deadlines, done)
+                    continue
+
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        raise StageError(name, error) from error
+                    self.results[name] = future.result()
+                    done.add(name)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.finished_at = time.time()
+
+        with self._lock:
+            blocked = [name for name in self.tasks if name not in done]
+        if blocked:
+            raise StageError(blocked[0], RuntimeError(f"unresolved dependencies for {', '.join(blocked)}"))
+        return self.results
+
+    def stage_durations(self) -> Dict[str, float]:
+        durations: Dict[str, float] = {}
+        for task in self.tasks.values():
+            durations[task.stage] = durations.get(task.stage, 0.0) + task.duration
+        return durations
+
+    def critical_path(self) -> CriticalPath:
+        finished = [task for task in self.tasks.values() if task.finished_at is not None]
+        if not finished:
+            return CriticalPath()
+
+        path = [max(finished, key=lambda task: task.finished_at)]
+        while path[-1].deps:
+            path.append(max((self.tasks[dep] for dep in path[-1].deps), key=lambda task: task.finished_at))
+        path.reverse()
+
+        return CriticalPath(tasks=path, wall_time=(self.finished_at or time.time()) - (self.started_at or 0.0))
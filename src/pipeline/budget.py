@@ -0,0 +1,53 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from config.budget import budget_config
+
+logger = logging.getLogger(__name__)
+
+STAGE_ORDER = ("parse", "generate", "serialize", "upload", "readme")
+
+
+@dataclass
+class Deferral:
+    item: str
+    reason: str
+
+
+class RunBudget:
+    def __init__(self, deadline_seconds: Optional[float] = None, started_at: Optional[float] = None):
+        self.deadline_seconds = deadline_seconds or budget_config.DEADLINE_SECONDS
+        self.started_at = started_at or time.time()
+        self.deadline = self.started_at + self.deadline_seconds
+        self.deferred: List[Deferral] = []
+
+    def elapsed(self) -> float:
+        return time.time() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.time())
+
+    def reserve_after(self, stage: str) -> float:
+        later = STAGE_ORDER[STAGE_ORDER.index(stage) + 1:]
+        return sum(budget_config.STAGE_BUDGETS.get(name, 0) for name in later)
+
+    def stage_timeout(self, stage: str) -> float:
+        return max(0.0, min(budget_config.STAGE_BUDGETS[stage], self.remaining() - self.reserve_after(stage)))
+
+    def allows(self, stage: str) -> bool:
+        return self.remaining() - self.reserve_after(stage) >= budget_config.STAGE_BUDGETS[stage]
+
+    def allows_upload(self) -> bool:
+        return self.remaining() - budget_config.STAGE_BUDGETS["readme"] >= budget_config.MIN_UPLOAD_SECONDS
+
+    def defer(self, item: str, reason: str) -> None:
+        self.deferred.append(Deferral(item=item, reason=reason))
+        logger.warning(
+            "Deferred %s: %s (%.0fs left)", item, reason, self.remaining(),
+            extra={"stage": "budget"}
+        )
+
+    def is_deferred(self, prefix: str) -> bool:
+        return any(deferral.item.startswith(prefix) for deferral in self.deferred)
@@ -0,0 +1,132 @@
+import cProfile
+import logging
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from config.logging import log_config
+from config.profiling import profiling_config
+
+logger = logging.getLogger(__name__)
+
+Function = Tuple[str, int, str]
+
+
+def _frame_name(function: Function) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{Path(filename).name}:{line}:{name}"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    raw: Dict[Function, tuple] = stats.stats
+    children: Dict[Function, List[Tuple[Function, float]]] = {}
+    for function, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            children.setdefault(caller, []).append((function, edge_cumulative))
+
+    lines: Dict[str, float] = {}
+
+    def walk(function: Function, stack: List[str], share: float) -> None:
+        _, _, self_time, cumulative, _ = raw[function]
+        stack.append(_frame_name(function))
+        if self_time * share > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0.0) + self_time * share
+
+        if len(stack) < profiling_config.MAX_STACK_DEPTH:
+            for child, edge_cumulative in children.get(function, []):
+                child_cumulative = raw[child][3]
+                if _frame_name(child) in stack or not child_cumulative or share * edge_cumulative < 1e-6:
+                    continue
+                walk(child, stack, share * edge_cumulative / child_cumulative)
+        stack.pop()
+
+    roots = [function for function, (_, _, _, _, callers) in raw.items() if not callers]
+    for root in roots:
+        walk(root, [], 1.0)
+
+    return [f"{stack} {round(seconds * 1_000_000)}" for stack, seconds in sorted(lines.items()) if seconds > 0]
+
+
+class StageProfiler:
+    def __init__(self, enabled: bool = False, run_id: Optional[str] = None):
+        self.enabled = enabled
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S")
+        self.output_dir = Path(log_config.LOG_DIR) / profiling_config.PROFILE_DIR / self.run_id
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+
+    def _start_tracing(self) -> None:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(profiling_config.TRACEMALLOC_FRAMES)
+                self._started_tracemalloc = True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    @contextmanager
+    def session(self) -> Iterator[None]:
+        if self.enabled:
+            self._start_tracing()
+        try:
+            yield
+        finally:
+            self.close()
+
+    def stage(self, name: str) -> ContextManager[None]:
+        if not self.enabled:
+            return nullcontext()
+        return self._profile(name)
+
+    @contextmanager
+    def _profile(self, name: str) -> Iterator[None]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._start_tracing()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            self._write(name, profiler, baseline, snapshot, peak)
+
+    def _write(
+        self,
+        name: str,
+        profiler: cProfile.Profile,
+        baseline: tracemalloc.Snapshot,
+        snapshot: tracemalloc.Snapshot,
+        peak: int
+    ) -> None:
+        file_stem = re.sub(r"[^\w.-]+", "_", name)
+        pstats_path = self.output_dir / f"{file_stem}.pstats"
+        profiler.dump_stats(pstats_path)
+        stats = pstats.Stats(profiler)
+
+        with open(self.output_dir / f"{file_stem}.collapsed", "w", encoding="utf-8") as f:
+            f.write("\n".join(collapsed_stacks(stats)))
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        differences = snapshot.filter_traces(filters).compare_to(baseline.filter_traces(filters), "lineno")
+        with open(self.output_dir / f"{file_stem}.alloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n\n")
+            for difference in differences[:profiling_config.TOP_ALLOCATIONS]:
+                f.write(f"{difference}\n")
+
+        logger.info("Profile for stage %s written to %s", name, self.output_dir, extra={"stage": name})
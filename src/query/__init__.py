@@ -0,0 +1,132 @@
+import bisect
+import json
+import logging
+import pickle
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from config.query import query_config
+from src.calendar_generator import CalendarsGenerator
+from src.checkpoints import hash_file, hash_parts
+from src.schedule_parser.lesson import Lesson, decode_schedule
+from src.storage import atomic_write
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+@dataclass(frozen=True)
+class LessonInterval:
+    start: datetime
+    end: datetime
+    lesson: Lesson
+
+
+class IntervalIndex:
+    def __init__(self, intervals: List[LessonInterval]):
+        self.intervals = sorted(intervals, key=lambda interval: (interval.start, interval.end))
+        self.starts = [interval.start for interval in self.intervals]
+
+        self.size = 1
+        while self.size < len(self.intervals):
+            self.size *= 2
+        self.max_end: List[Optional[datetime]] = [None] * (2 * self.size)
+        for i, interval in enumerate(self.intervals):
+            self.max_end[self.size + i] = interval.end
+        for node in range(self.size - 1, 0, -1):
+            children = [end for end in (self.max_end[2 * node], self.max_end[2 * node + 1]) if end is not None]
+            self.max_end[node] = max(children) if children else None
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    @classmethod
+    def from_lessons(cls, lessons: List[Lesson]) -> "IntervalIndex":
+        generator = CalendarsGenerator(data_path=None)
+        intervals = []
+        for lesson in lessons:
+            start, end = generator._event_times(lesson)
+            intervals.append(LessonInterval(start, end, lesson))
+        return cls(intervals)
+
+    def _collect(self, node: int, lo: int, hi: int, limit: int, after: datetime, result: List[int]) -> None:
+        if lo >= limit or self.max_end[node] is None or self.max_end[node] <= after:
+            return
+        if node >= self.size:
+            result.append(node - self.size)
+            return
+        mid = (lo + hi) // 2
+        self._collect(2 * node, lo, mid, limit, after, result)
+        self._collect(2 * node + 1, mid, hi, limit, after, result)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[LessonInterval]:
+        limit = bisect.bisect_left(self.starts, end)
+        positions: List[int] = []
+        if limit:
+            self._collect(1, 0, self.size, limit, start, positions)
+        return [self.intervals[i] for i in positions]
+
+    def at(self, instant: datetime) -> List[LessonInterval]:
+        limit = bisect.bisect_right(self.starts, instant)
+        positions: List[int] = []
+        if limit:
+            self._collect(1, 0, self.size, limit, instant, positions)
+        return [self.intervals[i] for i in positions]
+
+    def next_after(self, instant: datetime) -> Optional[LessonInterval]:
+        position = bisect.bisect_right(self.starts, instant)
+        if position < len(self.intervals):
+            return self.intervals[position]
+        return None
+
+    def free_slots(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        slots = []
+        cursor = start
+        for interval in sorted(self.overlapping(start, end), key=lambda interval: interval.start):
+            if interval.start > cursor:
+                slots.append((cursor, interval.start))
+            cursor = max(cursor, interval.end)
+        if cursor < end:
+            slots.append((cursor, end))
+        return slots
+
+    def conflicts(self, other: "IntervalIndex") -> List[Tuple[LessonInterval, LessonInterval]]:
+        return [
+            (interval, match)
+            for interval in self.intervals
+            for match in other.overlapping(interval.start, interval.end)
+        ]
+
+
+def _index_path(data_path: Path) -> Path:
+    path_hash = hash_parts(str(Path(data_path).resolve()))[:16]
+    return Path(query_config.INDEX_DIR) / f"{Path(data_path).stem}-{path_hash}{query_config.INDEX_SUFFIX}"
+
+
+def load_index(data_path: Path) -> IntervalIndex:
+    data_hash = hash_file(data_path)
+    index_path = _index_path(data_path)
+
+    if index_path.exists():
+        try:
+            with open(index_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("version") == INDEX_FORMAT_VERSION and cached.get("data_hash") == data_hash:
+                logger.debug("Using cached index %s", index_path)
+                return cached["index"]
+        except (pickle.UnpicklingError, EOFError, AttributeError, KeyError) as e:
+            logger.warning("Index cache is unreadable, rebuilding: %s", e)
+
+    with open(data_path, "r", encoding="utf-8") as f:
+        schedule = decode_schedule(json.load(f))
+    index = IntervalIndex.from_lessons([lesson for lessons in schedule.values() for lesson in lessons])
+
+    atomic_write(index_path, pickle.dumps({
+        "version": INDEX_FORMAT_VERSION,
+        "data_hash": data_hash,
+        "index": index
+    }, protocol=pickle.HIGHEST_PROTOCOL))
+    logger.info("Index rebuilt with %s lesson(s): %s", len(index), index_path)
+    return index
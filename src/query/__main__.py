@@ -0,0 +1,93 @@
+import argparse
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import List
+
+import pytz
+
+from config.calendar_generator import calendar_generator_config
+from config.query import query_config
+from config.schedule_parser import schedule_parser_config
+from src.query import LessonInterval, load_index
+
+TIMEZONE = pytz.timezone(calendar_generator_config.TIMEZONE)
+
+
+def _instant(value: str) -> datetime:
+    return TIMEZONE.localize(datetime.fromisoformat(value))
+
+
+def _day_bound(day: date, value: str) -> datetime:
+    return TIMEZONE.localize(datetime.combine(day, time.fromisoformat(value)))
+
+
+def _format(interval: LessonInterval) -> str:
+    lesson = interval.lesson
+    place = ", ".join(part for part in (lesson.building, lesson.room) if part)
+    return (
+        f"{interval.start:%Y-%m-%d %H:%M}-{interval.end:%H:%M}  "
+        f"{lesson.subject} - {lesson.work_type}"
+        + (f"  [{place}]" if place else "")
+        + (f"  {lesson.teacher_name}" if lesson.teacher_name else "")
+    )
+
+
+def _print(intervals: List[LessonInterval]) -> None:
+    if not intervals:
+        print("Nothing found")
+    for interval in sorted(intervals, key=lambda interval: interval.start):
+        print(_format(interval))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.query", description="Query the saved ITMO schedule")
+    parser.add_argument(
+        "--data", type=Path,
+        default=Path(schedule_parser_config.RESULT_DIR) / schedule_parser_config.RESULT_FILE
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    at_parser = commands.add_parser("at", help="lessons running at an instant")
+    at_parser.add_argument("instant", type=_instant, help="YYYY-MM-DDTHH:MM")
+
+    range_parser = commands.add_parser("range", help="lessons overlapping a range")
+    range_parser.add_argument("start", type=_instant)
+    range_parser.add_argument("end", type=_instant)
+
+    next_parser = commands.add_parser("next", help="next lesson")
+    next_parser.add_argument("--after", type=_instant, default=None)
+
+    free_parser = commands.add_parser("free", help="free slots on a day")
+    free_parser.add_argument("day", type=date.fromisoformat, help="YYYY-MM-DD")
+    free_parser.add_argument("--from", dest="day_start", default=query_config.DAY_START)
+    free_parser.add_argument("--to", dest="day_end", default=query_config.DAY_END)
+
+    conflicts_parser = commands.add_parser("conflicts", help="overlaps with another account's schedule")
+    conflicts_parser.add_argument("other", type=Path)
+
+    args = parser.parse_args()
+    index = load_index(args.data)
+
+    if args.command == "at":
+        _print(index.at(args.instant))
+    elif args.command == "range":
+        _print(index.overlapping(args.start, args.end))
+    elif args.command == "next":
+        interval = index.next_after(args.after or datetime.now(TIMEZONE))
+        _print([interval] if interval else [])
+    elif args.command == "free":
+        slots = index.free_slots(_day_bound(args.day, args.day_start), _day_bound(args.day, args.day_end))
+        if not slots:
+            print("No free slots")
+        for start, end in slots:
+            print(f"{start:%H:%M}-{end:%H:%M}")
+    elif args.command == "conflicts":
+        pairs = index.conflicts(load_index(args.other))
+        if not pairs:
+            print("No conflicts")
+        for own, other in pairs:
+            print(f"{_format(own)}\n  <-> {_format(other)}")
+
+
+if __name__ == "__main__":
+    main()
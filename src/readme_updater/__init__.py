@@ -1,64 +1,110 @@
+import hashlib
+import json
 import logging
-from datetime import datetime
-from typing import Dict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
 
+from config.calendar_generator import calendar_generator_config
 from config.readme_updater import readme_updater_config
+from src.calendar_generator import split_feed_name
 
 logger = logging.getLogger(__name__)
 
 class ReadMeUpdater:
     def _generate_subscription_links(self, download_url: str, calendar_name: str) -> str:
-        links_markdown = ""
+        links = []
         for service, data in readme_updater_config.CALENDAR_APPS.items():
             download_url_clean = download_url.replace("https://", "").replace("http://", "")
             url = data["url"].format(download_url=download_url, calendar_name=calendar_name, download_url_clean=download_url_clean).replace(" ", "%20")
             icon = data["icon"]
             protocol = data["protocol"]
             if protocol == "https" or protocol == "http":
-                links_markdown += f"[{icon} {service}]({url})\n\n"
+                links.append(f"[{icon} {service}]({url})")
             else:
-                links_markdown += f"{icon} {service}\n\n`{url}`\n\n"
+                links.append(f"{icon} {service}\n\n`{url}`")
 
-        return links_markdown
+        return "\n\n".join(links)
 
-    def _generate_calendar_section(self, calendar_name: str, download_url: str) -> str:
-        subscription_links = self._generate_subscription_links(download_url, calendar_name)
-        additional_links = f"📥 Прямая загрузка\n\n{download_url.replace(' ', '%20')}"
-
-        section = f"""
-### 📅 {calendar_name}
-
-#### 🔗 Ссылки для подписки
-{subscription_links}
-
-#### 📎 Дополнительные ссылки
-{additional_links}
-"""
-        return section.strip()
-
-    def update_readme(self, calendar_links: Dict[str, str]) -> None:
-        logger.info(f"Обновление README с {len(calendar_links)} календарями...")
-
-        content = "# ITMO Schedule ICS\n\n"
-        content += f"{readme_updater_config.CONTENT_LIST}\n\n"
-
-        content += "## 📅 Календари для подписки\n\n"
-        content += "*Автоматически обновляемые iCalendar (.ics) файлы*\n\n"
-
-        content += f"**🔄 Последнее обновление:** `{datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}`\n"
-        content += f"**📊 Количество календарей:** `{len(calendar_links)}`\n\n"
-
-        content += "---\n\n"
-
-        for calendar_name, url in calendar_links.items():
-            content += self._generate_calendar_section(calendar_name, url)
-            content += "\n\n---\n\n"
-
-        content += readme_updater_config.SETUP_GUIDES
-        content += "\n"
-        content += readme_updater_config.TROUBLESHOOTING
-        content += "\n"
-        content += readme_updater_config.START_GUIDE
-
-        with open(readme_updater_config.README_FILE, 'w', encoding="utf-8") as f:
-            f.write(content)
\ No newline at end of file
+    def _generate_variant_links(self, variants: List[Tuple[str, str]]) -> str:
+        links = []
+        for variant, download_url in sorted(variants, key=lambda item: (item[0] != "light", item[0])):
+            if variant == "light":
+                icon, label = "🪶", f"Ближайшие {calendar_generator_config.LIGHT_FEED_WEEKS} нед."
+            else:
+                icon, label = "🗓", variant
+            links.append(readme_updater_config.VARIANT_LINK_TEMPLATE.format(
+                icon=icon,
+                label=label,
+                download_url=download_url.replace(' ', '%20')
+            ))
+        return "".join(links)
+
+    def _generate_calendar_section(
+        self,
+        calendar_name: str,
+        download_url: str,
+        variants: List[Tuple[str, str]]
+    ) -> str:
+        return readme_updater_config.CALENDAR_SECTION_TEMPLATE.format(
+            calendar_name=calendar_name,
+            subscription_links=self._generate_subscription_links(download_url, calendar_name),
+            download_url=download_url.replace(' ', '%20'),
+            variant_links=self._generate_variant_links(variants)
+        )
+
+    def render(self, calendar_links: Dict[str, str]) -> str:
+        calendars: Dict[str, str] = {}
+        variants: Dict[str, List[Tuple[str, str]]] = {}
+        for calendar_name, download_url in calendar_links.items():
+            base_name, variant = split_feed_name(calendar_name)
+            if variant is None:
+                calendars[calendar_name] = download_url
+            else:
+                variants.setdefault(base_name, []).append((variant, download_url))
+
+        calendar_sections = "".join(
+            self._generate_calendar_section(calendar_name, calendars[calendar_name], variants.get(calendar_name, []))
+            for calendar_name in sorted(calendars)
+        )
+        return readme_updater_config.README_TEMPLATE.format(
+            content_list=readme_updater_config.CONTENT_LIST,
+            calendars_count=len(calendars),
+            calendar_sections=calendar_sections,
+            setup_guides=readme_updater_config.SETUP_GUIDES,
+            troubleshooting=readme_updater_config.TROUBLESHOOTING,
+            start_guide=readme_updater_config.START_GUIDE
+        )
+
+    def _write_status(self, calendar_links: Dict[str, str], content_hash: str, changed: bool) -> None:
+        status_dir = Path(readme_updater_config.STATUS_DIR)
+        status_dir.mkdir(exist_ok=True)
+
+        status = {
+            "last_update": datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC'),
+            "calendars_count": len(calendar_links),
+            "readme_hash": content_hash,
+            "readme_changed": changed
+        }
+        with open(status_dir / readme_updater_config.STATUS_FILE, 'w', encoding="utf-8") as f:
+            json.dump(status, f, ensure_ascii=False, indent=2)
+
+    def update_readme(self, calendar_links: Dict[str, str]) -> bool:
+        logger.info("Обновление README с %s календарями...", len(calendar_links))
+
+        content = self.render(calendar_links)
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        readme_path = Path(readme_updater_config.README_FILE)
+        existing = readme_path.read_text(encoding="utf-8") if readme_path.exists() else None
+        changed = existing != content
+
+        if changed:
+            with open(readme_path, 'w', encoding="utf-8") as f:
+                f.write(content)
+            logger.info("README has been updated")
+        else:
+            logger.info("README is up to date, skipping write")
+
+        self._write_status(calendar_links, content_hash, changed)
+        return changed
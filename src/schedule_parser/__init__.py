@@ -1,22 +1,34 @@
 import json
 import os
 import sys
+import threading
 import time
 import logging
+from datetime import date
 from pathlib import Path
-from typing import Dict, Any
+from typing import List, Optional
 
 from config.schedule_parser import schedule_parser_config
 from src.schedule_parser.cache import SessionCache
 from src.schedule_parser.authentification import Authentification
 from src.schedule_parser.api import APIClient, APIResponse
+from src.schedule_parser.lesson import Schedule, decode_schedule, encode_schedule
+from src.schedule_parser.planner import DateWindow, RangePlanner
+from src.storage import atomic_write
 
 logger = logging.getLogger(__name__)
 
+class FetchCancelled(Exception):
+    pass
+
 class ScheduleParser:
-    def __init__(self):
+    def __init__(self, cancel: Optional[threading.Event] = None):
+        self.cancel = cancel or threading.Event()
         self.cache: SessionCache = SessionCache()
-        self.api_client: APIClient = APIClient()
+        self.api_client: APIClient = APIClient(account=self.cache.account)
+        self.planner: RangePlanner = RangePlanner()
+        self.windows: Optional[List[DateWindow]] = None
+        self.schedule: Optional[Schedule] = None
         self.api_response: APIResponse = APIResponse(
             success=False,
             data="",
@@ -25,8 +37,30 @@ class ScheduleParser:
             cookies_count=0
         )
 
+    def _check_cancelled(self) -> None:
+        if self.cancel.is_set():
+            raise FetchCancelled("Fetch was cancelled, the previous schedule data is kept")
+
+    def plan(self) -> List[DateWindow]:
+        self.windows = self.planner.plan()
+        return self.windows
+
     def parse(self) -> APIResponse:
         logger.info("Parser started")
+        if self.windows is None:
+            self.plan()
+
+        if not self.windows:
+            logger.info("All windows are fresh, nothing to fetch")
+            self.api_response = APIResponse(
+                success=True,
+                data={},
+                status_code=0,
+                response_time=0,
+                cookies_count=0
+            )
+            return self.api_response
+
         logger.info("Checking cached cookies...")
         cached_cookies = self.cache.load()
 
@@ -35,21 +69,24 @@ class ScheduleParser:
 
             self.api_response = self.api_client.fetch(
                 cookies=cached_cookies,
+                windows=self.windows
             )
 
+            self._check_cancelled()
             if self.api_response.success:
                 logger.info("Cached cookies are valid")
-                logger.info(f"The data has been received: {self.api_response.status_code}")
-                logger.info(f"Response time: {self.api_response.response_time}")
+                logger.info("The data has been received: %s", self.api_response.status_code)
+                logger.info("Response time: %s", self.api_response.response_time)
                 return self.api_response
 
-            logger.warning(f"Cached cookies are invalid: {self.api_response.error}")
+            logger.warning("Cached cookies are invalid: %s", self.api_response.error)
             self.cache.clear()
 
         logger.info("Obtaining new cookies using Selenium...")
 
-        authentication = Authentification()
+        authentication = Authentification(cancel=self.cancel)
         cookies = authentication.login()
+        self._check_cancelled()
 
         if not cookies:
             logger.error("Selenium did not return cookies")
@@ -57,7 +94,9 @@ class ScheduleParser:
 
         self.api_response = self.api_client.fetch(
             cookies=cookies,
+            windows=self.windows
         )
+        self._check_cancelled()
 
         if self.api_response.success:
             self.cache.save(cookies, {
@@ -67,38 +106,46 @@ class ScheduleParser:
         else:
             raise Exception(f"API error after re-authentication: {self.api_response.error}")
 
-        logger.info(f"The data has been received: {self.api_response.status_code}")
-        logger.info(f"Response time: {self.api_response.response_time}")
+        logger.info("The data has been received: %s", self.api_response.status_code)
+        logger.info("Response time: %s", self.api_response.response_time)
         return self.api_response
 
-    def _merge_data(self, existing: Dict[str, Any], new: Dict[str, Any]) -> Any:
-        result = existing.copy()
+    def _merge_data(self, existing: Schedule, new: Schedule) -> Schedule:
+        result = {
+            date_str: lessons for date_str, lessons in existing.items()
+            if not any(window.contains(date.fromisoformat(date_str)) for window in self.windows or [])
+        }
         result.update(new)
-        return result
+        return dict(sorted(result.items()))
 
-    def _json_file_merge(self, file_path: str, new_data: Dict[str, Any], indent: int = 2) -> bool:
+    def _write_schedule(self, file_path: str, schedule: Schedule) -> None:
+        atomic_write(file_path, json.dumps(encode_schedule(schedule), ensure_ascii=False, separators=(",", ":")))
+        self.schedule = schedule
+
+    def _json_file_merge(self, file_path: str, new_data: Schedule) -> bool:
         try:
             if os.path.exists(file_path):
                 with open(file_path, 'r', encoding="utf-8") as f:
-                    existing_data = json.load(f)
+                    existing_data = decode_schedule(json.load(f))
                 merged_data = self._merge_data(existing_data, new_data)
             else:
                 merged_data = new_data
 
-            with open(file_path, 'w', encoding="utf-8") as f:
-                json.dump(merged_data, f, ensure_ascii=False, indent=indent)
-
+            self._write_schedule(file_path, merged_data)
             return True
 
         except json.JSONDecodeError:
-            with open(file_path, 'w', encoding="utf-8") as f:
-                json.dump(new_data, f, ensure_ascii=False, indent=indent)
+            logger.warning("Existing data is corrupted, keeping only the fetched windows and refetching the rest")
+            self.planner.reset()
+            self._write_schedule(file_path, new_data)
             return True
 
-        except Exception:
+        except Exception as e:
+            logger.error("Error while merging data: %s", e)
             return False
 
     def save(self, merge: bool = True) -> Path:
+        self._check_cancelled()
         data_dir = Path(schedule_parser_config.RESULT_DIR)
         data_dir.mkdir(exist_ok=True)
 
@@ -106,16 +153,15 @@ class ScheduleParser:
         data = self.api_response.data
 
         if merge:
-            success = self._json_file_merge(str(data_path), data, indent=2)
-            if success:
-                logger.info("Data has been successfully merged and saved")
-            else:
-                logger.error("Error while merging data saving without merge")
-                with open(data_path, 'w', encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+            if not self._json_file_merge(str(data_path), data):
+                logger.error("Keeping the existing data file, the fetched windows will be retried next run")
+                return data_path
+            logger.info("Data has been successfully merged and saved")
         else:
-            with open(data_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.planner.reset()
+            self._write_schedule(str(data_path), data)
+
+        self.planner.mark_fetched(self.windows or [])
 
-        logger.info(f"The result has been saved: {data_path}")
-        return data_path
\ No newline at end of file
+        logger.info("The result has been saved: %s", data_path)
+        return data_path
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date
 
 import requests
 import json
@@ -8,6 +8,11 @@ from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 
 from config.schedule_parser.api import api_config
+from config.schedule_parser.archive import archive_config
+from src.schedule_parser.archive import SnapshotArchive
+from src.schedule_parser.lesson import Lesson, Schedule
+from src.schedule_parser.planner import DateWindow
+from src.transport import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +26,11 @@ class APIResponse:
     error: Optional[str] = None
 
 class APIClient:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, account: str = "default"):
+        self.session = create_session()
         self.session.headers.update(api_config.HEADERS)
+        self.account = account
+        self.archive: Optional[SnapshotArchive] = SnapshotArchive() if archive_config.ENABLED else None
 
     def set_cookies(
         self,
@@ -31,30 +38,51 @@ class APIClient:
     ) -> None:
         self.session.cookies.clear()
         self.session.cookies.update(cookies)
-        logger.info(f"Cookies have been set: {len(cookies)} items")
+        logger.info("Cookies have been set: %s items", len(cookies))
 
     def _process_data(
         self,
         data: Dict[str, Any]
-    ) -> Dict[str, Any]:
+    ) -> Schedule:
         result = {}
         for day in data.get("data"):
             date_str = day.get("date")
-            day.pop("date")
-            result[date_str] = day.get("lessons")
+            day_date = date.fromisoformat(date_str)
+            result[date_str] = [Lesson.from_api(day_date, lesson) for lesson in day.get("lessons") or []]
         return result
 
+    def _archive(self, body: bytes, window: DateWindow) -> None:
+        if self.archive is None:
+            return
+        try:
+            self.archive.store(body, window, self.account)
+        except Exception as e:
+            logger.warning("Could not archive API response: %s", e)
+
+    def replay(self, content_hash: str) -> Schedule:
+        if self.archive is None:
+            self.archive = SnapshotArchive()
+        return self._process_data(json.loads(self.archive.load(content_hash)))
+
+    def _build_url(self, window: DateWindow) -> str:
+        return (
+            f"{api_config.BASE_API_URL}"
+            f"date_start={window.start.strftime('%Y-%m-%d')}&date_end={window.end.strftime('%Y-%m-%d')}"
+        )
+
     def request(
         self,
-        authorization_token: str
+        authorization_token: str,
+        window: DateWindow
     ) -> APIResponse:
         start_time = time.time()
+        url = self._build_url(window)
         
         try:
-            logger.info(f"GET -> {api_config.API_URL}")
+            logger.info("GET -> %s", url)
 
             response = self.session.get(
-                api_config.API_URL,
+                url,
                 headers={
                     "Authorization": authorization_token
                 },
@@ -65,8 +93,9 @@ class APIClient:
             response_time = time.time() - start_time
             
             if response.status_code == 200:
+                body = response.content
                 try:
-                    response_data = self._process_data(response.json())
+                    response_data = self._process_data(json.loads(body))
                 except json.JSONDecodeError:
                     return APIResponse(
                         success=False,
@@ -77,6 +106,7 @@ class APIClient:
                         error="Non-json received"
                     )
 
+                self._archive(body, window)
                 return APIResponse(
                     success=True,
                     data=response_data,
@@ -139,13 +169,28 @@ class APIClient:
                 error=error_msg
             )
     
-    def fetch(self, cookies: Dict[str, str]) -> APIResponse:
+    def fetch(self, cookies: Dict[str, str], windows: List[DateWindow]) -> APIResponse:
         self.set_cookies(cookies)
 
         authorization = cookies["auth._token.itmoId"].replace("%20", ' ')
 
-        logger.info("Fetching data")
-            
-        response = self.request(authorization)
-        
-        return response
\ No newline at end of file
+        logger.info("Fetching data for %s window(s)", len(windows))
+
+        data = {}
+        response_time = 0.0
+        response = None
+        for window in windows:
+            response = self.request(authorization, window)
+            response_time += response.response_time
+            if not response.success:
+                response.response_time = response_time
+                return response
+            data.update(response.data)
+
+        return APIResponse(
+            success=True,
+            data=data,
+            status_code=response.status_code if response else 0,
+            response_time=response_time,
+            cookies_count=len(self.session.cookies)
+        )
\ No newline at end of file
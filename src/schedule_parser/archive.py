@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.schedule_parser.archive import archive_config
+from src.schedule_parser.planner import DateWindow
+from src.storage import atomic_write, file_lock
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SnapshotEntry:
+    fetched_at: float
+    date_start: str
+    date_end: str
+    account: str
+    content_hash: str
+
+
+def _compress(body: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return "zst", zstandard.ZstdCompressor(level=archive_config.ZSTD_LEVEL).compress(body)
+    return "gz", gzip.compress(body, compresslevel=archive_config.GZIP_LEVEL, mtime=0)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("Snapshot is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotArchive:
+    def __init__(self, archive_dir: Optional[Path] = None):
+        self.archive_dir = Path(archive_dir or archive_config.ARCHIVE_DIR)
+        self.index_path = self.archive_dir / archive_config.INDEX_FILE
+        self.lock_path = self.archive_dir / archive_config.LOCK_FILE
+
+    def _read_index(self) -> Dict[str, Any]:
+        if not self.index_path.exists():
+            return {"entries": [], "objects": {}}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error("Snapshot index read error, starting a new one: %s", e)
+            return {"entries": [], "objects": {}}
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        atomic_write(self.index_path, json.dumps(index, separators=(",", ":")))
+
+    def _object_path(self, content_hash: str, codec: str) -> Path:
+        return self.archive_dir / "objects" / content_hash[:2] / f"{content_hash}.json.{codec}"
+
+    def store(self, body: bytes, window: DateWindow, account: str) -> str:
+        content_hash = hashlib.sha256(body).hexdigest()
+        now = time.time()
+
+        with file_lock(self.lock_path, timeout=archive_config.LOCK_TIMEOUT):
+            index = self._read_index()
+            objects = index["objects"]
+
+            stored = objects.get(content_hash)
+            if stored and self._object_path(content_hash, stored["codec"]).exists():
+                stored["last_access"] = now
+                logger.debug("Snapshot %s already archived", content_hash[:12])
+            else:
+                codec, compressed = _compress(body)
+                atomic_write(self._object_path(content_hash, codec), compressed)
+                objects[content_hash] = {
+                    "codec": codec,
+                    "size": len(compressed),
+                    "raw_size": len(body),
+                    "last_access": now
+                }
+                logger.info(
+                    "Archived snapshot %s: %s bytes, %s compressed", content_hash[:12], len(body), len(compressed)
+                )
+
+            entry = SnapshotEntry(
+                fetched_at=now,
+                date_start=window.start.isoformat(),
+                date_end=window.end.isoformat(),
+                account=account,
+                content_hash=content_hash
+            )
+            if self._latest_hash(index, entry) != content_hash:
+                index["entries"].append(asdict(entry))
+                del index["entries"][:-archive_config.MAX_ENTRIES]
+            self._evict(index, keep=content_hash)
+            self._write_index(index)
+
+        return content_hash
+
+    def _latest_hash(self, index: Dict[str, Any], entry: SnapshotEntry) -> Optional[str]:
+        for previous in reversed(index["entries"]):
+            if (
+                previous["account"] == entry.account
+                and previous["date_start"] == entry.date_start
+                and previous["date_end"] == entry.date_end
+            ):
+                return previous["content_hash"]
+        return None
+
+    def _evict(self, index: Dict[str, Any], keep: str) -> None:
+        objects = index["objects"]
+        total = sum(stored["size"] for stored in objects.values())
+        if total <= archive_config.MAX_BYTES:
+            return
+
+        evicted = set()
+        for content_hash, stored in sorted(objects.items(), key=lambda item: item[1]["last_access"]):
+            if total <= archive_config.MAX_BYTES:
+                break
+            if content_hash == keep:
+                continue
+            self._object_path(content_hash, stored["codec"]).unlink(missing_ok=True)
+            total -= stored["size"]
+            evicted.add(content_hash)
+
+        for content_hash in evicted:
+            del objects[content_hash]
+        index["entries"] = [entry for entry in index["entries"] if entry["content_hash"] not in evicted]
+        logger.info("Evicted %s snapshot(s) from the archive, %s bytes remain", len(evicted), total)
+
+    def entries(self, account: Optional[str] = None) -> List[SnapshotEntry]:
+        return [
+            SnapshotEntry(**entry) for entry in self._read_index()["entries"]
+            if account is None or entry["account"] == account
+        ]
+
+    def load(self, content_hash: str) -> bytes:
+        with file_lock(self.lock_path, timeout=archive_config.LOCK_TIMEOUT):
+            index = self._read_index()
+            stored = index["objects"].get(content_hash)
+            if stored is None:
+                raise KeyError(f"Snapshot {content_hash} is not in the archive")
+            stored["last_access"] = time.time()
+            self._write_index(index)
+
+        with open(self._object_path(content_hash, stored["codec"]), "rb") as f:
+            return _decompress(stored["codec"], f.read())
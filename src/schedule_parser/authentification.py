@@ -3,23 +3,25 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import threading
 import time
 import logging
 from typing import Dict, Optional
 
 from config.schedule_parser.authentification import authentification_config
+from config.schedule_parser.cache import cache_config
 from config.schedule_parser.selenium import selenium_config
+from src.schedule_parser.cache import jwt_expires_at
 
 logger = logging.getLogger(__name__)
 
 class Authentification:
-    def __init__(self):
+    def __init__(self, cancel: Optional[threading.Event] = None):
         self.driver = None
-    
-    def login(self) -> Optional[Dict[str, str]]:
-        logger.info(f"Authorization on {authentification_config.LOGIN_URL}")
-        start_time = time.time()
+        self.phases: Dict[str, float] = {}
+        self.cancel = cancel or threading.Event()
 
+    def _build_options(self, optimized: bool) -> Options:
         options = Options()
         if selenium_config.HEADLESS:
             options.add_argument("--headless=new")
@@ -58,10 +60,68 @@ class Authentification:
             "profile.default_content_settings.popups": 0
         }
         options.add_experimental_option("prefs", prefs)
-        
-        self.driver = webdriver.Chrome(options=options)
-        
+
+        if optimized:
+            options.page_load_strategy = selenium_config.PAGE_LOAD_STRATEGY
+            excluded_hosts = ", ".join(f"EXCLUDE {host}" for host in selenium_config.ALLOWED_HOSTS)
+            options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {excluded_hosts}")
+
+        return options
+
+    def _phase(self, name: str, started_at: float) -> float:
+        now = time.time()
+        self.phases[name] = now - started_at
+        return now
+
+    def _token_ready(self, driver: webdriver.Chrome) -> bool:
+        cookie = driver.get_cookie(cache_config.TOKEN_COOKIE)
+        if not cookie:
+            return False
+        expires_at = jwt_expires_at(cookie.get("value", ""))
+        return expires_at is not None and expires_at - time.time() > cache_config.EXPIRY_MARGIN
+
+    def _wait_for_token(self, wait: WebDriverWait) -> None:
+        wait.until(self._token_ready)
+
+    def _wait_for_endpoint(self, wait: WebDriverWait) -> None:
+        wait.until(EC.url_to_be(authentification_config.ENDPOINT_URL))
+        current_url = self.driver.current_url
+        if not (current_url == authentification_config.ENDPOINT_URL):
+            logger.warning("There may be an authentication error, current URL: %s", current_url)
+
+    def _quit_on_cancel(self, driver: webdriver.Chrome, finished: threading.Event) -> None:
+        while not finished.wait(selenium_config.CANCEL_POLL_INTERVAL):
+            if self.cancel.is_set():
+                logger.warning("Login was cancelled, closing the browser")
+                driver.quit()
+                return
+
+    def login(self) -> Optional[Dict[str, str]]:
+        if selenium_config.OPTIMIZED_LOGIN:
+            cookies = self._login(optimized=True)
+            if cookies or self.cancel.is_set():
+                return cookies
+            logger.warning("Optimized login failed, retrying with a regular page load")
+        return self._login(optimized=False)
+
+    def _login(self, optimized: bool) -> Optional[Dict[str, str]]:
+        logger.info("Authorization on %s (optimized: %s)", authentification_config.LOGIN_URL, optimized)
+        start_time = time.time()
+        self.phases = {}
+
+        self.driver = webdriver.Chrome(options=self._build_options(optimized))
+        phase_start = self._phase("driver_start", start_time)
+        finished = threading.Event()
+        threading.Thread(target=self._quit_on_cancel, args=(self.driver, finished), daemon=True).start()
+
         try:
+            if optimized and selenium_config.BLOCKED_URL_PATTERNS:
+                self.driver.execute_cdp_cmd("Network.enable", {})
+                self.driver.execute_cdp_cmd(
+                    "Network.setBlockedURLs",
+                    {"urls": list(selenium_config.BLOCKED_URL_PATTERNS)}
+                )
+
             self.driver.get(authentification_config.LOGIN_URL)
 
             wait = WebDriverWait(self.driver, selenium_config.TIMEOUT)
@@ -69,6 +129,8 @@ class Authentification:
             user_elem = wait.until(
                 EC.presence_of_element_located((By.NAME, authentification_config.USERNAME_FIELD_NAME))
             )
+            phase_start = self._phase("login_page", phase_start)
+
             user_elem.clear()
             user_elem.send_keys(authentification_config.USERNAME)
 
@@ -78,30 +140,38 @@ class Authentification:
             
             submit_btn = self.driver.find_element(By.NAME, authentification_config.SUBMIT_BUTTON_FIELD_NAME)
             submit_btn.click()
-            
+            phase_start = self._phase("submit", phase_start)
+
+            if optimized:
+                self._wait_for_token(wait)
+            else:
+                self._wait_for_endpoint(wait)
+            phase_start = self._phase("token_wait", phase_start)
 
-            wait.until(EC.url_to_be(authentification_config.ENDPOINT_URL))
-            current_url = self.driver.current_url
-            if not (current_url == authentification_config.ENDPOINT_URL):
-                logger.warning("There may be an authentication error, current URL: %s", current_url)
-            
             selenium_cookies = self.driver.get_cookies()
             cookies_dict = {}
             
             for cookie in selenium_cookies:
                 cookies_dict[cookie["name"]] = cookie["value"]
+            self._phase("cookies", phase_start)
             
             elapsed = time.time() - start_time
-            logger.info(f"Authorization successful in {elapsed:.1f}с")
-            logger.info(f"Cookies received: {len(cookies_dict)}")
-            logger.info(f"Current URL: {current_url}")
+            logger.info("Authorization successful in %.1fс", elapsed)
+            logger.info(
+                "Login phases: %s",
+                ", ".join(f"{name} {duration:.2f}s" for name, duration in self.phases.items()),
+                extra={"stage": "login", "duration_ms": round(elapsed * 1000)}
+            )
+            logger.info("Cookies received: %s", len(cookies_dict))
+            logger.info("Current URL: %s", self.driver.current_url)
             
             return cookies_dict
             
         except Exception as e:
-            logger.error(f"Authorization error: {e}")
+            logger.error("Authorization error: %s", e)
             
         finally:
-            if self.driver:
+            finished.set()
+            if self.driver and not self.cancel.is_set():
                 self.driver.quit()
                 logger.debug("Driver is closed.")
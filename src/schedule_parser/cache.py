@@ -1,20 +1,72 @@
+import base64
 import json
 
 import time
 import logging
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
+from config.schedule_parser.authentification import authentification_config
 from config.schedule_parser.cache import cache_config
+from src.storage import atomic_write, file_lock
 
 logger = logging.getLogger(__name__)
 
-class SessionCache:    
-    def __init__(self):
+def jwt_expires_at(token: str) -> Optional[float]:
+    jwt = token.replace("%20", " ").split(" ")[-1]
+    parts = jwt.split(".")
+    if len(parts) != 3:
+        return None
+
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        if exp:
+            return float(exp)
+    except (ValueError, AttributeError, TypeError) as e:
+        logger.debug("Could not decode token payload: %s", e)
+    return None
+
+
+def token_expires_at(cookies: Dict[str, str]) -> Optional[float]:
+    expires_at = jwt_expires_at(cookies.get(cache_config.TOKEN_COOKIE, ""))
+    if expires_at is not None:
+        return expires_at
+
+    expiration = cookies.get(cache_config.TOKEN_EXPIRATION_COOKIE)
+    if expiration and expiration.isdigit():
+        return int(expiration) / 1000
+    return None
+
+
+class SessionCache:
+    def __init__(self, account: Optional[str] = None):
         cache_dir = Path(cache_config.CACHE_DIR)
         cache_dir.mkdir(exist_ok=True)
+        self.account = account or authentification_config.USERNAME or "default"
         self.cache_file_path = cache_dir / cache_config.COOKIES_FILE
-    
+        self.lock_file_path = cache_dir / cache_config.LOCK_FILE
+
+    def _read_all(self) -> Dict[str, Any]:
+        if not self.cache_file_path.exists():
+            return {}
+
+        try:
+            with open(self.cache_file_path, 'r') as f:
+                cache_data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error("Cache read error: %s", e)
+            return {}
+
+        if not isinstance(cache_data, dict):
+            return {}
+        if "cookies" in cache_data:
+            return {self.account: cache_data}
+        return cache_data.get("accounts", {})
+
+    def _write_all(self, accounts: Dict[str, Any]) -> None:
+        atomic_write(self.cache_file_path, json.dumps({"accounts": accounts}, indent=2))
+
     def save(
         self,
         cookies: Dict[str, str],
@@ -23,60 +75,67 @@ class SessionCache:
         cache_data = {
             "cookies": cookies,
             "saved_at": time.time(),
+            "expires_at": token_expires_at(cookies),
             "count": len(cookies),
             "metadata": metadata or {}
         }
-        
-        with open(self.cache_file_path, 'w') as f:
-            json.dump(cache_data, f, indent=2)
-        
-        logger.info(f"Cookies have been saved to the cache: {len(cookies)} items")
-    
+
+        with file_lock(self.lock_file_path, timeout=cache_config.LOCK_TIMEOUT):
+            accounts = self._read_all()
+            accounts[self.account] = cache_data
+            self._write_all(accounts)
+
+        logger.info("Cookies have been saved to the cache: %s items", len(cookies))
+
     def load(self) -> Optional[Dict[str, str]]:
-        if not self.cache_file_path.exists():
+        with file_lock(self.lock_file_path, timeout=cache_config.LOCK_TIMEOUT):
+            cache_data = self._read_all().get(self.account)
+
+        if not cache_data:
             logger.debug("Сookies were not found in the cache")
             return None
-        
-        try:
-            with open(self.cache_file_path, 'r') as f:
-                cache_data = json.load(f)
-            
-            cookies = cache_data.get("cookies", {})
-            
-            if not cookies:
-                logger.warning("Cookies cache is empty")
-                return None
-            
-            logger.info(f"Cookies loaded from cache: {len(cookies)} items")
-            return cookies
-            
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Cache read error: {e}")
+
+        cookies = cache_data.get("cookies", {})
+
+        if not cookies:
+            logger.warning("Cookies cache is empty")
+            return None
+
+        ttl = self.ttl(cache_data)
+        if ttl is not None and ttl <= cache_config.EXPIRY_MARGIN:
+            logger.info("Cached cookies are expired or about to expire (ttl %.0fs), re-authenticating", ttl)
             return None
-    
+
+        logger.info("Cookies loaded from cache: %s items", len(cookies))
+        return cookies
+
+    def ttl(self, cache_data: Dict[str, Any]) -> Optional[float]:
+        expires_at = cache_data.get("expires_at") or token_expires_at(cache_data.get("cookies", {}))
+        if expires_at is None:
+            return None
+        return expires_at - time.time()
+
     def clear(self) -> None:
-        if self.cache_file_path.exists():
-            self.cache_file_path.unlink()
-            logger.info("Cached cookies have been cleared.")
-    
+        with file_lock(self.lock_file_path, timeout=cache_config.LOCK_TIMEOUT):
+            accounts = self._read_all()
+            if accounts.pop(self.account, None) is not None:
+                self._write_all(accounts)
+                logger.info("Cached cookies have been cleared.")
+
     def get_info(self) -> Dict:
-        if not self.cache_file_path.exists():
+        cache_data = self._read_all().get(self.account)
+        if not cache_data:
             return {"exists": False}
-        
-        try:
-            with open(self.cache_file_path, 'r') as f:
-                data = json.load(f)
-            
-            age = time.time() - data.get("saved_at", 0)
-            
-            return {
-                "exists": True,
-                "cookies_count": len(data.get("cookies", {})),
-                "age_seconds": age,
-                "age_human": f"{age:.0f} секунд",
-                "saved_at": data.get("saved_at"),
-                "metadata": data.get("metadata", {})
-            }
-            
-        except Exception as e:
-            return {"exists": False, "error": str(e)}
\ No newline at end of file
+
+        age = time.time() - cache_data.get("saved_at", 0)
+
+        return {
+            "exists": True,
+            "account": self.account,
+            "cookies_count": len(cache_data.get("cookies", {})),
+            "age_seconds": age,
+            "age_human": f"{age:.0f} секунд",
+            "ttl_seconds": self.ttl(cache_data),
+            "saved_at": cache_data.get("saved_at"),
+            "metadata": cache_data.get("metadata", {})
+        }
@@ -0,0 +1,119 @@
+import sys
+from dataclasses import dataclass, fields
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional
+
+SCHEDULE_FORMAT_VERSION = 1
+
+_INTERNED_FIELDS = ("subject", "work_type", "format", "teacher_name", "room", "building", "group")
+
+
+def _parse_time(value: Optional[str]) -> Optional[time]:
+    if not value:
+        return None
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def _format_time(value: Optional[time]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.strftime("%H:%M")
+
+
+@dataclass(slots=True)
+class Lesson:
+    date: date
+    subject: Optional[str] = None
+    work_type: Optional[str] = None
+    work_type_id: Optional[int] = None
+    time_start: Optional[time] = None
+    time_end: Optional[time] = None
+    format: Optional[str] = None
+    teacher_name: Optional[str] = None
+    teacher_id: Optional[int] = None
+    room: Optional[str] = None
+    building: Optional[str] = None
+    group: Optional[str] = None
+    note: Optional[str] = None
+    zoom_url: Optional[str] = None
+    zoom_password: Optional[str] = None
+    zoom_info: Optional[str] = None
+    pair_id: Optional[int] = None
+
+    def __post_init__(self):
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, str):
+                setattr(self, name, sys.intern(value))
+
+    @classmethod
+    def from_api(cls, day: date, lesson: Dict[str, Any]) -> "Lesson":
+        return cls(
+            date=day,
+            subject=lesson.get("subject"),
+            work_type=lesson.get("work_type"),
+            work_type_id=lesson.get("work_type_id"),
+            time_start=_parse_time(lesson.get("time_start")),
+            time_end=_parse_time(lesson.get("time_end")),
+            format=lesson.get("format"),
+            teacher_name=lesson.get("teacher_name"),
+            teacher_id=lesson.get("teacher_id"),
+            room=lesson.get("room"),
+            building=lesson.get("building"),
+            group=lesson.get("group"),
+            note=lesson.get("note"),
+            zoom_url=lesson.get("zoom_url"),
+            zoom_password=lesson.get("zoom_password"),
+            zoom_info=lesson.get("zoom_info"),
+            pair_id=lesson.get("pair_id")
+        )
+
+    def to_row(self) -> List[Any]:
+        return [
+            _format_time(value) if isinstance(value, time) else value
+            for value in (getattr(self, name) for name in ROW_FIELDS)
+        ]
+
+    @classmethod
+    def from_row(cls, day: date, row: List[Any]) -> "Lesson":
+        values = dict(zip(ROW_FIELDS, row))
+        values["time_start"] = _parse_time(values.get("time_start"))
+        values["time_end"] = _parse_time(values.get("time_end"))
+        return cls(date=day, **values)
+
+
+ROW_FIELDS = tuple(f.name for f in fields(Lesson) if f.name != "date")
+
+Schedule = Dict[str, List[Lesson]]
+
+
+def encode_schedule(schedule: Schedule) -> Dict[str, Any]:
+    return {
+        "version": SCHEDULE_FORMAT_VERSION,
+        "fields": list(ROW_FIELDS),
+        "days": {
+            date_str: [lesson.to_row() for lesson in lessons]
+            for date_str, lessons in schedule.items()
+        }
+    }
+
+
+def decode_schedule(raw: Dict[str, Any]) -> Schedule:
+    if raw.get("version") != SCHEDULE_FORMAT_VERSION:
+        return {
+            date_str: [Lesson.from_api(date.fromisoformat(date_str), lesson) for lesson in lessons or []]
+            for date_str, lessons in raw.items()
+        }
+
+    stored_fields = raw.get("fields", list(ROW_FIELDS))
+    positions = None
+    if tuple(stored_fields) != ROW_FIELDS:
+        positions = [stored_fields.index(name) if name in stored_fields else None for name in ROW_FIELDS]
+
+    schedule = {}
+    for date_str, rows in raw.get("days", {}).items():
+        day = date.fromisoformat(date_str)
+        if positions is not None:
+            rows = [[row[i] if i is not None else None for i in positions] for row in rows]
+        schedule[date_str] = [Lesson.from_row(day, row) for row in rows]
+    return schedule
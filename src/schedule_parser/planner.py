@@ -0,0 +1,135 @@
+import json
+import time
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config.schedule_parser import schedule_parser_config
+from config.schedule_parser.planner import planner_config
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class DateWindow:
+    start: date
+    end: date
+    keys: Tuple[str, ...] = field(default_factory=tuple)
+
+    def contains(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+
+class RangePlanner:
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or datetime.now()
+        self.today = self.now.date()
+        self.freshness_path = Path(schedule_parser_config.RESULT_DIR) / planner_config.FRESHNESS_FILE
+        self.freshness: Dict[str, float] = self._load_freshness()
+
+    def academic_year(self) -> Tuple[date, date]:
+        end_this_year = date(
+            self.today.year,
+            planner_config.ACADEMIC_YEAR_END_MONTH,
+            planner_config.ACADEMIC_YEAR_END_DAY
+        )
+        start_year = self.today.year - 1 if self.today < end_this_year else self.today.year
+
+        year_start = date(
+            start_year,
+            planner_config.ACADEMIC_YEAR_START_MONTH,
+            planner_config.ACADEMIC_YEAR_START_DAY
+        )
+        year_end = date(
+            start_year + 1,
+            planner_config.ACADEMIC_YEAR_END_MONTH,
+            planner_config.ACADEMIC_YEAR_END_DAY
+        )
+        return year_start, year_end
+
+    def _load_freshness(self) -> Dict[str, float]:
+        if not self.freshness_path.exists():
+            return {}
+
+        try:
+            with open(self.freshness_path, 'r', encoding="utf-8") as f:
+                return json.load(f).get("windows", {})
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning("Freshness file is corrupted, refetching everything: %s", e)
+            return {}
+
+    def _weeks(self, year_start: date, year_end: date) -> List[Tuple[date, date]]:
+        weeks = []
+        week_start = year_start - timedelta(days=year_start.weekday())
+        step = timedelta(days=planner_config.FAR_WINDOW_DAYS)
+        while week_start <= year_end:
+            weeks.append((week_start, week_start + step - timedelta(days=1)))
+            week_start += step
+        return weeks
+
+    def _is_stale(self, key: str) -> bool:
+        fetched_at = self.freshness.get(key)
+        if fetched_at is None:
+            return True
+        return self.now.timestamp() - fetched_at >= planner_config.FAR_REFRESH_INTERVAL
+
+    def plan(self) -> List[DateWindow]:
+        year_start, year_end = self.academic_year()
+        near_start = max(self.today, year_start)
+        near_end = min(near_start + timedelta(days=planner_config.NEAR_HORIZON_DAYS - 1), year_end)
+
+        windows: List[DateWindow] = []
+        for week_start, week_end in self._weeks(year_start, year_end):
+            key = week_start.isoformat()
+            start = max(week_start, year_start)
+            end = min(week_end, year_end)
+
+            if end < self.today:
+                if key not in self.freshness:
+                    windows.append(DateWindow(start, end, (key,)))
+                continue
+
+            if start <= near_end:
+                near_window_start = start if key not in self.freshness else max(start, near_start)
+                windows.append(DateWindow(near_window_start, min(end, near_end), (key,) if end <= near_end else ()))
+                if end <= near_end:
+                    continue
+                start = near_end + timedelta(days=1)
+
+            if self._is_stale(key):
+                windows.append(DateWindow(start, end, (key,)))
+
+        merged = self._coalesce(windows)
+        logger.info("Planned %s fetch window(s): %s", len(merged), ", ".join(f"{w.start}..{w.end}" for w in merged))
+        return merged
+
+    def _coalesce(self, windows: List[DateWindow]) -> List[DateWindow]:
+        result: List[DateWindow] = []
+        for window in sorted(windows, key=lambda w: w.start):
+            if result and window.start <= result[-1].end + timedelta(days=1):
+                last = result.pop()
+                window = DateWindow(
+                    last.start,
+                    max(last.end, window.end),
+                    last.keys + tuple(k for k in window.keys if k not in last.keys)
+                )
+            result.append(window)
+        return result
+
+    def reset(self) -> None:
+        self.freshness = {}
+
+    def mark_fetched(self, windows: List[DateWindow]) -> None:
+        fetched_at = time.time()
+        for window in windows:
+            for key in window.keys:
+                self.freshness[key] = fetched_at
+
+        year_start, _ = self.academic_year()
+        oldest_key = (year_start - timedelta(days=year_start.weekday())).isoformat()
+        self.freshness = {k: v for k, v in self.freshness.items() if k >= oldest_key}
+
+        self.freshness_path.parent.mkdir(exist_ok=True)
+        with open(self.freshness_path, 'w', encoding="utf-8") as f:
+            json.dump({"windows": self.freshness}, f, indent=2, sort_keys=True)
@@ -0,0 +1,163 @@
+import logging
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
+
+from config.transport import transport_config
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HostStats:
+    dns_lookups: int = 0
+    dns_hits: int = 0
+    connections: int = 0
+    requests: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.connections)
+
+
+_stats: Dict[str, HostStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(host: Optional[str], **counters: int) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(host or "", HostStats())
+        for name, value in counters.items():
+            setattr(stats, name, getattr(stats, name) + value)
+
+
+def transport_stats() -> Dict[str, HostStats]:
+    with _stats_lock:
+        return {host: HostStats(**vars(stats)) for host, stats in _stats.items()}
+
+
+class _CountingPoolMixin:
+    host: str
+
+    def _new_conn(self):
+        _record(self.host, connections=1)
+        return super()._new_conn()
+
+    def _make_request(self, conn, *args, **kwargs):
+        _record(self.host, requests=1)
+        return super()._make_request(conn, *args, **kwargs)
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class LimitedPoolManager(PoolManager):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_classes_by_scheme = {"http": CountingHTTPConnectionPool, "https": CountingHTTPSConnectionPool}
+
+    def _new_pool(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        request_context: Optional[Dict[str, Any]] = None
+    ) -> HTTPConnectionPool:
+        if request_context is None:
+            request_context = self.connection_pool_kw.copy()
+        if host in transport_config.HOST_LIMITS:
+            request_context["maxsize"] = transport_config.HOST_LIMITS[host]
+        return super()._new_pool(scheme, host, port, request_context)
+
+
+_pool_manager: Optional[LimitedPoolManager] = None
+_pool_lock = threading.Lock()
+
+
+def _socket_options() -> List[Tuple[int, int, int]]:
+    options = list(HTTPConnection.default_socket_options)
+    if transport_config.TCP_KEEPALIVE:
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    return options
+
+
+def shared_pool_manager() -> LimitedPoolManager:
+    global _pool_manager
+    with _pool_lock:
+        if _pool_manager is None:
+            install_dns_cache()
+            _pool_manager = LimitedPoolManager(
+                num_pools=transport_config.POOL_CONNECTIONS,
+                maxsize=transport_config.POOL_MAXSIZE,
+                block=transport_config.POOL_BLOCK,
+                socket_options=_socket_options()
+            )
+        return _pool_manager
+
+
+class SharedPoolAdapter(HTTPAdapter):
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = shared_pool_manager()
+
+    def close(self) -> None:
+        for proxy_manager in self.proxy_manager.values():
+            proxy_manager.clear()
+
+
+def create_adapter(max_retries: Any = 0) -> SharedPoolAdapter:
+    return SharedPoolAdapter(
+        pool_connections=transport_config.POOL_CONNECTIONS,
+        pool_maxsize=transport_config.POOL_MAXSIZE,
+        max_retries=max_retries,
+        pool_block=transport_config.POOL_BLOCK
+    )
+
+
+def create_session(max_retries: Any = 0) -> requests.Session:
+    session = requests.Session()
+    adapter = create_adapter(max_retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_dns_cache: Dict[Tuple, Tuple[float, Any]] = {}
+_dns_lock = threading.Lock()
+_original_getaddrinfo = socket.getaddrinfo
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    with _dns_lock:
+        cached = _dns_cache.get(key)
+    if cached and cached[0] > now:
+        _record(host, dns_hits=1)
+        return cached[1]
+
+    result = _original_getaddrinfo(host, port, family, type, proto, flags)
+    with _dns_lock:
+        _dns_cache[key] = (now + transport_config.DNS_CACHE_TTL, result)
+    _record(host, dns_lookups=1)
+    return result
+
+
+def install_dns_cache() -> None:
+    if transport_config.DNS_CACHE_TTL > 0 and socket.getaddrinfo is not _cached_getaddrinfo:
+        socket.getaddrinfo = _cached_getaddrinfo
+        logger.debug("DNS cache installed with a %ss TTL", transport_config.DNS_CACHE_TTL)
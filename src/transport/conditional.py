@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.storage import atomic_write
+
+logger = logging.getLogger(__name__)
+
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+@dataclass
+class ConditionalStats:
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    rate_limit_remaining: Optional[str] = None
+
+
+_stats: Dict[str, ConditionalStats] = {}
+_stats_lock = threading.Lock()
+
+
+def conditional_stats() -> Dict[str, ConditionalStats]:
+    with _stats_lock:
+        return {name: ConditionalStats(**vars(stats)) for name, stats in _stats.items()}
+
+
+class ConditionalCache:
+    def __init__(self, name: str, directory: Path, max_age: int):
+        self.name = name
+        self.directory = Path(directory)
+        self.max_age = max_age
+        with _stats_lock:
+            _stats.setdefault(name, ConditionalStats())
+        self.prune()
+
+    def _record(self, response: requests.Response, **counters: int) -> None:
+        with _stats_lock:
+            stats = _stats[self.name]
+            for counter, value in counters.items():
+                setattr(stats, counter, getattr(stats, counter) + value)
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                stats.rate_limit_remaining = remaining
+
+    def key(self, url: str, headers: Mapping[str, str]) -> str:
+        return hashlib.sha256(
+            "\0".join((url, headers.get("Authorization", ""), headers.get("Accept", ""))).encode("utf-8")
+        ).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Dropping unreadable %s cache entry %s: %s", self.name, path.name, e)
+            path.unlink(missing_ok=True)
+            return None
+
+    def _store(self, key: str, url: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        if not etag:
+            return
+        headers = {
+            header: value for header, value in response.headers.items()
+            if header.lower() not in _DROPPED_HEADERS
+        }
+        atomic_write(self._path(key), json.dumps(
+            {"url": url, "etag": etag, "headers": headers, "body": response.text},
+            ensure_ascii=False
+        ))
+        self._record(response, stored=1)
+
+    def _cached_response(self, key: str, entry: Dict[str, Any], fresh: requests.Response) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response.encoding = "utf-8"
+        response._content = entry["body"].encode("utf-8")
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers.update(
+            (header, value) for header, value in fresh.headers.items() if header.lower().startswith("x-ratelimit")
+        )
+        os.utime(self._path(key))
+        return response
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]], headers: Mapping[str, str]) -> Dict[str, str]:
+        if not entry:
+            return dict(headers)
+        return {**headers, "If-None-Match": entry["etag"]}
+
+    def resolve(
+        self,
+        key: str,
+        url: str,
+        entry: Optional[Dict[str, Any]],
+        response: requests.Response
+    ) -> requests.Response:
+        if response.status_code == 304 and entry:
+            self._record(response, hits=1)
+            return self._cached_response(key, entry, response)
+
+        self._record(response, misses=1)
+        if response.status_code == 200:
+            self._store(key, url, response)
+        return response
+
+    def prune(self) -> int:
+        if not self.directory.exists():
+            return 0
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info("Removed %s expired %s cache entr(ies)", removed, self.name)
+        return removed
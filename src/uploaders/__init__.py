@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Protocol
+
+from icalendar import Calendar
+
+from config import Uploader
+from config.calendar_generator import calendar_generator_config
+
+
+class UploadError(Exception):
+    pass
+
+
+UploadCallback = Callable[[str, str], None]
+
+
+def remote_path(path: Path, remote_dir: Optional[Path] = None) -> Path:
+    return Path(remote_dir or calendar_generator_config.CALENDAR_DIR) / path.name
+
+
+@dataclass
+class PublishedFile:
+    path: Path
+    content: bytes
+    link: str
+
+
+class CalendarUploader(Protocol):
+    name: str
+
+    def upload(
+        self,
+        calendars: Dict[str, Calendar],
+        calendars_paths: Dict[str, Path],
+        on_uploaded: Optional[UploadCallback] = None,
+        remote_dir: Optional[Path] = None
+    ) -> Dict[str, str]:
+        ...
+
+    def fetch_published(self, calendars_dir: Path) -> List[PublishedFile]:
+        ...
+
+
+UploaderFactory = Callable[[], CalendarUploader]
+
+_registry: Dict[Uploader, UploaderFactory] = {}
+
+
+def register_uploader(kind: Uploader, factory: UploaderFactory) -> None:
+    _registry[kind] = factory
+
+
+def create_uploader(kind: Uploader) -> CalendarUploader:
+    if kind not in _registry:
+        raise UploadError(f"Unknown upload way: {kind}")
+    return _registry[kind]()
+
+
+def _github() -> CalendarUploader:
+    from src.uploaders.github import GitHubUploader
+    return GitHubUploader()
+
+
+def _dropbox() -> CalendarUploader:
+    from src.uploaders.dropbox import DropboxUploader
+    return DropboxUploader()
+
+
+def _local() -> CalendarUploader:
+    from src.uploaders.local import LocalUploader
+    return LocalUploader()
+
+
+register_uploader(Uploader.GITHUB, _github)
+register_uploader(Uploader.DROPBOX, _dropbox)
+register_uploader(Uploader.LOCAL, _local)
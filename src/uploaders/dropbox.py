@@ -1,8 +1,8 @@
 import json
 import logging
-import sys
+import time
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 import requests
 
 import dropbox
@@ -11,80 +11,127 @@ from dropbox.files import WriteMode, FileMetadata
 from icalendar import Calendar
 
 from config.calendar_generator import calendar_generator_config
+from config.schedule_parser.cache import cache_config
 from config.uploaders.dropbox import dropbox_config
+from src.storage import atomic_write, file_lock
+from src.transport import create_session
+from src.uploaders import PublishedFile, UploadCallback, UploadError, remote_path
 
 logger = logging.getLogger(__name__)
 
+class DropboxTokenError(UploadError):
+    pass
+
+
 class DropboxUploader:
+    name = "dropbox"
+
     def __init__(self):
         logger.info("Initializing DropboxUploader")
-        try:
-            access_token = self._get_fresh_access_token()
+        self.token_cache_path = Path(cache_config.CACHE_DIR) / dropbox_config.TOKEN_CACHE_FILE
+        self.token_lock_path = Path(cache_config.CACHE_DIR) / dropbox_config.TOKEN_LOCK_FILE
+        self.session = create_session()
+        self._ready_folders = set()
+        self.dbx = self._create_client(self._get_access_token())
 
-            if not access_token:
-                raise ValueError("Dropbox access token is not configured")
+    def _create_client(self, access_token: str) -> dropbox.Dropbox:
+        logger.info("Creating Dropbox client")
+        return dropbox.Dropbox(access_token, timeout=dropbox_config.TIMEOUT, session=self.session)
 
-            logger.info("Creating Dropbox client")
-            self.dbx = dropbox.Dropbox(
-                access_token,
-                timeout=dropbox_config.TIMEOUT if hasattr(dropbox_config, "TIMEOUT") else 30
-            )
-
-            self.dbx.users_get_current_account()
-            logger.info("Successfully authenticated with Dropbox")
+    def _load_cached_token(self) -> Optional[str]:
+        if not self.token_cache_path.exists():
+            return None
 
+        try:
+            with open(self.token_cache_path, 'r') as f:
+                token_data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Dropbox token cache read error: %s", e)
+            return None
+
+        expires_at = token_data.get("expires_at", 0)
+        if time.time() >= expires_at - dropbox_config.TOKEN_EXPIRY_MARGIN:
+            logger.info("Cached Dropbox access token is expired")
+            return None
+
+        logger.info("Using cached Dropbox access token, expires in %.0fs", expires_at - time.time())
+        return token_data.get("access_token")
+
+    def _save_cached_token(self, access_token: str, expires_in: int) -> None:
+        self.token_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.token_lock_path, timeout=dropbox_config.TOKEN_LOCK_TIMEOUT):
+            atomic_write(self.token_cache_path, json.dumps({
+                "access_token": access_token,
+                "expires_at": time.time() + expires_in
+            }))
+
+    def _get_access_token(self, force_refresh: bool = False) -> str:
+        if not force_refresh:
+            access_token = self._load_cached_token()
+            if access_token:
+                return access_token
+        return self._get_fresh_access_token()
+
+    def _get_fresh_access_token(self) -> str:
+        logger.info("Refreshing Dropbox access token")
+        try:
+            response = self.session.post(dropbox_config.TOKEN_URL, data={
+                'grant_type': 'refresh_token',
+                'refresh_token': dropbox_config.DROPBOX_REFRESH_TOKEN,
+                'client_id': dropbox_config.DROPBOX_APP_KEY,
+                'client_secret': dropbox_config.DROPBOX_APP_SECRET
+            }, timeout=dropbox_config.TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            raise DropboxTokenError(f"Failed to refresh token: {e}") from e
+
+        if response.status_code != 200:
+            raise DropboxTokenError(f"Failed to refresh token: {response.text}")
+
+        token_data = response.json()
+        access_token = token_data.get('access_token')
+        if not access_token:
+            raise DropboxTokenError("Dropbox access token is not configured")
+
+        self._save_cached_token(access_token, token_data.get('expires_in', 0))
+        return access_token
+
+    def _call(self, method: str, *args, **kwargs):
+        try:
+            return getattr(self.dbx, method)(*args, **kwargs)
         except AuthError as e:
-            logger.error(f"Dropbox authentication failed: {e}")
-            sys.exit(1)
-        except Exception as e:
-            logger.error(f"Failed to initialize DropboxUploader: {e}")
-            sys.exit(1)
-
-    def _get_fresh_access_token(self):
-        url = "https://api.dropboxapi.com/oauth2/token"
-
-        response = requests.post(url, data={
-            'grant_type': 'refresh_token',
-            'refresh_token': dropbox_config.DROPBOX_REFRESH_TOKEN,
-            'client_id': dropbox_config.DROPBOX_APP_KEY,
-            'client_secret': dropbox_config.DROPBOX_APP_SECRET
-        })
-
-        if response.status_code == 200:
-            return response.json()['access_token']
-        else:
-            raise Exception(f"Failed to refresh token: {response.text}")
+            logger.warning("Dropbox rejected the access token, refreshing: %s", e)
+            self.dbx = self._create_client(self._get_access_token(force_refresh=True))
+            return getattr(self.dbx, method)(*args, **kwargs)
 
     def _check_folder(self, folder_path: str) -> bool:
-        logger.info(f"Checking for existing folder: '{folder_path}'")
+        logger.info("Checking for existing folder: '%s'", folder_path)
         try:
-            self.dbx.files_get_metadata(folder_path)
-            logger.info(f"Found existing folder: '{folder_path}'")
+            self._call("files_get_metadata", folder_path)
+            logger.info("Found existing folder: '%s'", folder_path)
             return True
         except ApiError as e:
             if e.error.is_path() and e.error.get_path().is_not_found():
-                logger.info(f"Folder '{folder_path}' does not exist")
+                logger.info("Folder '%s' does not exist", folder_path)
                 return False
             else:
-                logger.error(f"Error checking folder '{folder_path}': {e}")
-                sys.exit(1)
+                raise UploadError(f"Error checking folder '{folder_path}': {e}") from e
 
     def _create_folder(self, folder_path: str) -> None:
-        logger.info(f"Creating new folder: '{folder_path}'")
+        logger.info("Creating new folder: '%s'", folder_path)
         try:
-            self.dbx.files_create_folder_v2(folder_path)
-            logger.info(f"Folder '{folder_path}' created successfully")
+            self._call("files_create_folder_v2", folder_path)
+            logger.info("Folder '%s' created successfully", folder_path)
         except ApiError as e:
             if e.error.is_path() and e.error.get_path().is_conflict():
-                logger.info(f"Folder '{folder_path}' already exists (concurrent creation)")
+                logger.info("Folder '%s' already exists (concurrent creation)", folder_path)
             else:
-                logger.error(f"Error creating folder '{folder_path}': {e}")
-                sys.exit(1)
+                raise UploadError(f"Error creating folder '{folder_path}': {e}") from e
 
     def _get_direct_download_link(self, file_path_str: str) -> str:
-        logger.info(f"Getting direct download link for: '{file_path_str}'")
+        logger.info("Getting direct download link for: '%s'", file_path_str)
         try:
-            shared_link_metadata = self.dbx.sharing_create_shared_link_with_settings(
+            shared_link_metadata = self._call(
+                "sharing_create_shared_link_with_settings",
                 file_path_str,
                 settings=None
             )
@@ -99,12 +146,13 @@ class DropboxUploader:
                 else:
                     direct_link += "?dl=1"
 
-            logger.info(f"Generated permanent direct download link for '{file_path_str}'")
+            logger.info("Generated permanent direct download link for '%s'", file_path_str)
             return direct_link
 
         except ApiError as e:
             if e.error.is_shared_link_already_exists():
-                links = self.dbx.sharing_list_shared_links(
+                links = self._call(
+                    "sharing_list_shared_links",
                     path=file_path_str,
                     direct_only=True
                 )
@@ -116,85 +164,122 @@ class DropboxUploader:
                         direct_link += "?dl=1"
                     return direct_link
 
-            logger.error(f"Failed to get download link for '{file_path_str}': {e}")
-            sys.exit(1)
+            raise UploadError(f"Failed to get download link for '{file_path_str}': {e}") from e
 
     def _upload_or_update_file(self, content: bytes, file_path_str: str) -> str:
-        logger.info(f"Processing file: '{file_path_str}'")
+        logger.info("Processing file: '%s'", file_path_str)
 
         try:
             mode = WriteMode.overwrite
 
-            result = self.dbx.files_upload(
+            result = self._call(
+                "files_upload",
                 content,
                 file_path_str,
                 mode=mode,
                 autorename=False
             )
 
-            logger.info(f"Successfully uploaded file: '{file_path_str}'")
+            logger.info("Successfully uploaded file: '%s'", file_path_str)
 
             direct_link = self._get_direct_download_link(file_path_str)
 
             return direct_link
 
         except ApiError as e:
-            logger.error(f"Failed to upload file '{file_path_str}': {e}")
-            sys.exit(1)
+            raise UploadError(f"Failed to upload file '{file_path_str}': {e}") from e
+        except UploadError:
+            raise
         except Exception as e:
-            logger.error(f"Error processing file '{file_path_str}': {e}")
-            sys.exit(1)
+            raise UploadError(f"Error processing file '{file_path_str}': {e}") from e
 
     def _check_existing_file(self, dropbox_path: str) -> bool:
-        logger.info(f"Checking for existing file: '{dropbox_path}'")
+        logger.info("Checking for existing file: '%s'", dropbox_path)
         try:
-            self.dbx.files_get_metadata(dropbox_path)
-            logger.info(f"File exists: '{dropbox_path}'")
+            self._call("files_get_metadata", dropbox_path)
+            logger.info("File exists: '%s'", dropbox_path)
             return True
         except ApiError as e:
             if e.error.is_path() and e.error.get_path().is_not_found():
-                logger.info(f"File does not exist: '{dropbox_path}'")
+                logger.info("File does not exist: '%s'", dropbox_path)
                 return False
             else:
-                logger.error(f"Error checking file '{dropbox_path}': {e}")
-                sys.exit(1)
+                raise UploadError(f"Error checking file '{dropbox_path}': {e}") from e
 
-    def upload(self, calendars: Dict[str, Calendar], calendars_paths: Dict[str, Path]) -> Dict[str, str]:
-        logger.info(f"Starting Dropbox upload of {len(calendars)} calendar(s)")
+    def upload(
+        self,
+        calendars: Dict[str, Calendar],
+        calendars_paths: Dict[str, Path],
+        on_uploaded: Optional[UploadCallback] = None,
+        remote_dir: Optional[Path] = None
+    ) -> Dict[str, str]:
+        logger.info("Starting Dropbox upload of %s calendar(s)", len(calendars))
 
         try:
-            folder_name = calendar_generator_config.CALENDAR_DIR
+            folder_name = str(remote_dir or calendar_generator_config.CALENDAR_DIR).replace('\\', '/')
             folder_name = folder_name.strip('/')
             folder_path = f"/{folder_name}"
 
-            logger.info(f"Using Dropbox folder path: {folder_path}")
+            logger.info("Using Dropbox folder path: %s", folder_path)
 
-            if not self._check_folder(folder_path):
-                self._create_folder(folder_path)
+            if folder_path not in self._ready_folders:
+                if not self._check_folder(folder_path):
+                    self._create_folder(folder_path)
+                self._ready_folders.add(folder_path)
 
             download_urls = {}
 
             for calendar_name in calendars:
                 file_path = calendars_paths[calendar_name]
-                file_path_str = str(file_path).replace('\\', '/')
+                file_path_str = str(remote_path(file_path, remote_dir)).replace('\\', '/')
                 file_path_str = f"/{file_path_str}"
                 content = calendars[calendar_name].to_ical()
 
-                logger.info(f"Processing calendar: '{calendar_name}' from file: {file_path.name}")
+                logger.info("Processing calendar: '%s' from file: %s", calendar_name, file_path.name)
 
                 file_exists = self._check_existing_file(file_path_str)
 
                 if file_exists:
-                    logger.info(f"File exists, updating: '{file_path.name}'")
+                    logger.info("File exists, updating: '%s'", file_path.name)
                 else:
-                    logger.info(f"Creating new file: '{file_path.name}'")
+                    logger.info("Creating new file: '%s'", file_path.name)
 
                 download_url = self._upload_or_update_file(content, file_path_str)
                 download_urls[calendar_name] = download_url
+                if on_uploaded:
+                    on_uploaded(calendar_name, download_url)
 
-            logger.info(f"Dropbox upload completed. Generated {len(download_urls)} direct download URL(s)")
+            logger.info("Dropbox upload completed. Generated %s direct download URL(s)", len(download_urls))
             return download_urls
 
+        except UploadError:
+            raise
         except Exception as e:
-            logger.error(f"Failed during Dropbox upload process: {e}")
-            sys.exit(1)
\ No newline at end of file
+            raise UploadError(f"Failed during Dropbox upload process: {e}") from e
+
+    def fetch_published(self, calendars_dir: Path) -> List[PublishedFile]:
+        folder_path = f"/{calendars_dir.as_posix().strip('/')}"
+        if not self._check_folder(folder_path):
+            return []
+
+        entries = []
+        result = self._call("files_list_folder", folder_path)
+        while True:
+            entries.extend(
+                entry for entry in result.entries
+                if isinstance(entry, FileMetadata) and entry.name.endswith(".ics")
+            )
+            if not result.has_more:
+                break
+            result = self._call("files_list_folder_continue", result.cursor)
+
+        published = []
+        for entry in entries:
+            _, response = self._call("files_download", entry.path_display)
+            published.append(PublishedFile(
+                path=Path(entry.path_display.lstrip("/")),
+                content=response.content,
+                link=self._get_direct_download_link(entry.path_display)
+            ))
+        logger.info("Found %s published calendar(s) in Dropbox folder %s", len(published), folder_path)
+        return published
@@ -0,0 +1,236 @@
+import logging
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from icalendar import Calendar
+
+from config import Uploader
+from config.dedup import dedup_config
+from src.checkpoints import CheckpointStore, hash_file
+from src.dedup import LessonStore
+from src.uploaders import CalendarUploader, PublishedFile, UploadError, create_uploader
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class UploadResult:
+    backend: str
+    success: bool
+    links: Dict[str, str] = field(default_factory=dict)
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+_STOP = object()
+
+
+class BackendWorker:
+    def __init__(self, backend: str):
+        self.backend = backend
+        self._jobs: "queue.Queue[Any]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"uploader-{backend}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                return
+            future, function, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        future: Future = Future()
+        self._jobs.put((future, function, args))
+        return future
+
+    def stop(self) -> None:
+        self._jobs.put(_STOP)
+
+
+class FanOutUploader:
+    def __init__(
+        self,
+        backends: Sequence[Uploader],
+        mirror_timeout: Optional[float] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        store: Optional[LessonStore] = None
+    ):
+        if not backends:
+            raise UploadError("No upload backends configured")
+        self.backends = list(dict.fromkeys(backends))
+        self.mirror_timeout = mirror_timeout
+        self.checkpoints = checkpoints
+        self.store = store if dedup_config.GROUP_CALENDARS else None
+        self.results: List[UploadResult] = []
+        self._uploaders: Dict[Uploader, CalendarUploader] = {}
+        self._workers: Dict[Uploader, BackendWorker] = {}
+        self._futures: List[Tuple[Uploader, Future]] = []
+        self._mirror_deadline: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _uploader(self, kind: Uploader) -> CalendarUploader:
+        if kind not in self._uploaders:
+            self._uploaders[kind] = create_uploader(kind)
+        return self._uploaders[kind]
+
+    def _worker(self, kind: Uploader) -> BackendWorker:
+        with self._lock:
+            if kind not in self._workers:
+                self._workers[kind] = BackendWorker(kind.name.lower())
+            return self._workers[kind]
+
+    def fetch_published(self, kind: Uploader, calendars_dir: Path) -> List[PublishedFile]:
+        return self._worker(kind).submit(lambda: self._uploader(kind).fetch_published(calendars_dir)).result()
+
+    def _content_hashes(self, calendars_paths: Dict[str, Path]) -> Dict[str, Optional[str]]:
+        return {calendar_name: hash_file(path) for calendar_name, path in calendars_paths.items()}
+
+    def _group_dir(self, group_name: str) -> Path:
+        return Path(dedup_config.GROUP_DIR) / re.sub(r"[^\w.-]+", "_", group_name)
+
+    def _run_backend(
+        self,
+        kind: Uploader,
+        calendars: Dict[str, Calendar],
+        calendars_paths: Dict[str, Path],
+        content_hashes: Dict[str, Optional[str]],
+        groups: Dict[str, str]
+    ) -> UploadResult:
+        start_time = time.time()
+        backend = kind.name.lower()
+        links: Dict[str, str] = {}
+        pending = dict(calendars)
+
+        if self.checkpoints:
+            for calendar_name in calendars:
+                content_hash = content_hashes.get(calendar_name)
+                cached_link = content_hash and self.checkpoints.get(f"upload:{backend}:{calendar_name}", content_hash)
+                if cached_link:
+                    links[calendar_name] = cached_link
+                    del pending[calendar_name]
+
+        def on_uploaded(calendar_name: str, download_url: str) -> None:
+            content_hash = content_hashes.get(calendar_name)
+            if self.checkpoints and content_hash:
+                self.checkpoints.complete(f"upload:{backend}:{calendar_name}", content_hash, download_url)
+            if self.store and content_hash and calendar_name in grouped:
+                self.store.record_group_publication(
+                    backend, grouped[calendar_name], calendar_name, content_hash, download_url
+                )
+
+        grouped: Dict[str, str] = {}
+        group_pending: Dict[str, Dict[str, Calendar]] = {}
+        if self.store:
+            shared = 0
+            for calendar_name in list(pending):
+                group_name = groups.get(calendar_name)
+                content_hash = content_hashes.get(calendar_name)
+                if not group_name or not content_hash:
+                    continue
+                grouped[calendar_name] = group_name
+                group_link = self.store.group_link(backend, group_name, calendar_name, content_hash)
+                if group_link:
+                    links[calendar_name] = group_link
+                    on_uploaded(calendar_name, group_link)
+                    shared += 1
+                else:
+                    group_pending.setdefault(group_name, {})[calendar_name] = pending[calendar_name]
+                del pending[calendar_name]
+            if shared:
+                logger.info("Backend '%s': %s group calendar(s) already published for this content", backend, shared)
+
+        try:
+            for group_name, group_calendars in group_pending.items():
+                links.update(self._uploader(kind).upload(
+                    group_calendars, calendars_paths, on_uploaded=on_uploaded, remote_dir=self._group_dir(group_name)
+                ))
+            if pending:
+                links.update(self._uploader(kind).upload(pending, calendars_paths, on_uploaded=on_uploaded))
+            elif not group_pending:
+                logger.info("Backend '%s' already has every calendar, nothing to upload", backend)
+            return UploadResult(backend=backend, success=True, links=links, duration=time.time() - start_time)
+        except Exception as e:
+            logger.error("Uploader '%s' failed with error: %s", backend, e)
+            return UploadResult(backend=backend, success=False, duration=time.time() - start_time, error=str(e))
+
+    def upload(
+        self,
+        calendars: Dict[str, Calendar],
+        calendars_paths: Dict[str, Path],
+        groups: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        logger.info("Publishing %s calendar(s) to %s backend(s)", len(calendars), len(self.backends))
+
+        content_hashes = self._content_hashes(calendars_paths)
+        futures = {
+            kind: self._worker(kind).submit(
+                self._run_backend, kind, calendars, calendars_paths, content_hashes, groups or {}
+            )
+            for kind in self.backends
+        }
+        with self._lock:
+            if self._mirror_deadline is None and self.mirror_timeout is not None:
+                self._mirror_deadline = time.monotonic() + self.mirror_timeout
+            self._futures.extend(futures.items())
+
+        for kind in self.backends:
+            future = futures[kind]
+            wait([future], timeout=None if kind == self.backends[0] else self._mirror_remaining())
+            if future.done() and future.result().success:
+                return future.result().links
+
+        raise UploadError("All upload backends failed")
+
+    def _mirror_remaining(self) -> Optional[float]:
+        if self._mirror_deadline is None:
+            return None
+        return max(0.0, self._mirror_deadline - time.monotonic())
+
+    def close(self) -> List[UploadResult]:
+        with self._lock:
+            futures = list(self._futures)
+            self._futures.clear()
+            workers = list(self._workers.values())
+            self._workers.clear()
+
+        wait([future for kind, future in futures if kind != self.backends[0]], timeout=self._mirror_remaining())
+
+        results: Dict[str, UploadResult] = {}
+        for kind, future in futures:
+            backend = kind.name.lower()
+            summary = results.setdefault(backend, UploadResult(backend=backend, success=True))
+            if not future.done():
+                future.cancel()
+                summary.success = False
+                summary.error = "Timed out, still running in background"
+                continue
+            result = future.result()
+            summary.links.update(result.links)
+            summary.duration += result.duration
+            if not result.success:
+                summary.success = False
+                summary.error = result.error
+
+        for worker in workers:
+            worker.stop()
+
+        self.results = list(results.values())
+        for result in self.results:
+            status = "ok" if result.success else f"failed ({result.error})"
+            logger.info(
+                "Backend '%s': %s in %.2fs, %s link(s)", result.backend, status, result.duration, len(result.links),
+                extra={"stage": f"upload:{result.backend}", "duration_ms": round(result.duration * 1000)}
+            )
+        return self.results
@@ -1,46 +1,114 @@
+import base64
 import logging
-import sys
+import threading
 from pathlib import Path
 
 from github import Github
+from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass, Requester, RequestsResponse
 from icalendar import Calendar
-from typing import Dict
+from typing import Dict, List, Optional
 
 from config.uploaders.github import github_config
+from src.transport import create_adapter
+from src.transport.conditional import ConditionalCache
+from src.uploaders import PublishedFile, UploadCallback, UploadError, remote_path
 
 logger = logging.getLogger(__name__)
 
+_http_cache: Optional[ConditionalCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def _conditional_cache() -> Optional[ConditionalCache]:
+    global _http_cache
+    if not github_config.HTTP_CACHE:
+        return None
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = ConditionalCache(
+                "github", Path(github_config.HTTP_CACHE_DIR), github_config.HTTP_CACHE_MAX_AGE
+            )
+        return _http_cache
+
+
+class _ConditionalGetMixin:
+    protocol: str
+    host: str
+    port: int
+    url: str
+    verb: str
+    headers: Dict[str, str]
+    stream: bool
+
+    def getresponse(self) -> RequestsResponse:
+        cache = _conditional_cache()
+        if cache is None or self.verb.upper() != "GET" or self.stream:
+            return super().getresponse()
+
+        url = f"{self.protocol}://{self.host}:{self.port}{self.url}"
+        key = cache.key(url, self.headers)
+        entry = cache.load(key)
+        self.headers = cache.conditional_headers(entry, self.headers)
+        response = super().getresponse()
+        return RequestsResponse(cache.resolve(key, url, entry, response.response))
+
+
+class SharedHTTPSConnection(_ConditionalGetMixin, HTTPSRequestsConnectionClass):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.adapter = create_adapter(self.retry)
+        self.session.mount("https://", self.adapter)
+
+
+class SharedHTTPConnection(_ConditionalGetMixin, HTTPRequestsConnectionClass):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.adapter = create_adapter(self.retry)
+        self.session.mount("http://", self.adapter)
+
+
 class GitHubUploader:
+    name = "github"
+
     def __init__(self):
         logger.info("Initializing GitHubUploader")
         try:
-            logger.info(f"Connecting to GitHub repository: {github_config.REPO} on branch: {github_config.BRANCH}")
+            logger.info("Connecting to GitHub repository: %s on branch: %s", github_config.REPO, github_config.BRANCH)
+            Requester.injectConnectionClasses(SharedHTTPConnection, SharedHTTPSConnection)
             self.github = Github(github_config.GITHUB_TOKEN)
             self.repo_name = github_config.REPO
             self.repo = self.github.get_repo(self.repo_name)
             self.branch = github_config.BRANCH
-            logger.info(f"Successfully connected to repository: {self.repo_name}")
+            logger.info("Successfully connected to repository: %s", self.repo_name)
         except Exception as e:
-            logger.error(f"Failed to initialize GitHubUploader: {e}")
-            sys.exit(1)
+            raise UploadError(f"Failed to initialize GitHubUploader: {e}") from e
+
+    def _download_url(self, file_path_str: str) -> str:
+        return f"https://raw.githubusercontent.com/{self.repo_name}/{self.branch}/{file_path_str}"
 
-    def upload(self, calendars: Dict[str, Calendar], calendars_paths: Dict[str, Path]):
-        logger.info(f"Starting upload of {len(calendars)} calendar(s)")
+    def upload(
+        self,
+        calendars: Dict[str, Calendar],
+        calendars_paths: Dict[str, Path],
+        on_uploaded: Optional[UploadCallback] = None,
+        remote_dir: Optional[Path] = None
+    ) -> Dict[str, str]:
+        logger.info("Starting upload of %s calendar(s)", len(calendars))
         download_urls = {}
 
         for calendar_name in calendars:
             file_path = calendars_paths[calendar_name]
-            file_path_str = str(file_path).replace("\\", "/")
+            file_path_str = str(remote_path(file_path, remote_dir)).replace("\\", "/")
 
-            logger.info(f"Processing calendar: {calendar_name} at path: {file_path_str}")
+            logger.info("Processing calendar: %s at path: %s", calendar_name, file_path_str)
 
             try:
                 content = calendars[calendar_name].to_ical()
-                logger.info(f"Calendar '{calendar_name}' encoded to iCal format")
+                logger.info("Calendar '%s' encoded to iCal format", calendar_name)
 
                 try:
                     existing_file = self.repo.get_contents(file_path_str, ref=self.branch)
-                    logger.info(f"File exists, updating: {file_path_str}")
+                    logger.info("File exists, updating: %s", file_path_str)
 
                     self.repo.update_file(
                         path=file_path_str,
@@ -49,13 +117,13 @@ class GitHubUploader:
                         sha=existing_file.sha,
                         branch=self.branch
                     )
-                    logger.info(f"Successfully updated file: {file_path_str}")
+                    logger.info("Successfully updated file: %s", file_path_str)
 
                 except Exception as e:
                     if "404" in str(e):
-                        logger.info(f"File does not exist, creating new: {file_path_str}")
+                        logger.info("File does not exist, creating new: %s", file_path_str)
                     else:
-                        logger.warning(f"Error when checking file existence: {e}, attempting to create new file")
+                        logger.warning("Error when checking file existence: %s, attempting to create new file", e)
 
                     self.repo.create_file(
                         path=file_path_str,
@@ -63,15 +131,33 @@ class GitHubUploader:
                         content=content,
                         branch=self.branch
                     )
-                    logger.info(f"Successfully created new file: {file_path_str}")
+                    logger.info("Successfully created new file: %s", file_path_str)
 
-                download_url = f"https://raw.githubusercontent.com/{self.repo_name}/{self.branch}/{file_path_str}"
+                download_url = self._download_url(file_path_str)
                 download_urls[calendar_name] = download_url
-                logger.info(f"Generated download URL for '{calendar_name}'")
+                logger.info("Generated download URL for '%s'", calendar_name)
+                if on_uploaded:
+                    on_uploaded(calendar_name, download_url)
 
             except Exception as e:
-                logger.error(f"Failed to upload calendar '{calendar_name}': {e}")
-                sys.exit(1)
+                raise UploadError(f"Failed to upload calendar '{calendar_name}': {e}") from e
+
+        logger.info("Upload completed. Generated %s download URL(s)", len(download_urls))
+        return download_urls
 
-        logger.info(f"Upload completed. Generated {len(download_urls)} download URL(s)")
-        return download_urls
\ No newline at end of file
+    def fetch_published(self, calendars_dir: Path) -> List[PublishedFile]:
+        folder = calendars_dir.as_posix().strip("/")
+        tree = self.repo.get_git_tree(self.branch, recursive=True)
+        published = []
+        for element in tree.tree:
+            path = Path(element.path)
+            if element.type != "blob" or path.parent.as_posix() != folder or path.suffix != ".ics":
+                continue
+            blob = self.repo.get_git_blob(element.sha)
+            published.append(PublishedFile(
+                path=path,
+                content=base64.b64decode(blob.content),
+                link=self._download_url(element.path)
+            ))
+        logger.info("Found %s published calendar(s) in %s/%s", len(published), self.repo_name, folder)
+        return published
@@ -0,0 +1,62 @@
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from icalendar import Calendar
+
+from config.uploaders.local import local_config
+from src.uploaders import PublishedFile, UploadCallback, UploadError, remote_path
+
+logger = logging.getLogger(__name__)
+
+class LocalUploader:
+    name = "local"
+
+    def __init__(self):
+        self.target_dir = Path(local_config.TARGET_DIR)
+
+    def _download_url(self, target_path: Path) -> str:
+        if local_config.BASE_URL:
+            relative_path = target_path.relative_to(self.target_dir).as_posix()
+            return f"{local_config.BASE_URL.rstrip('/')}/{relative_path}"
+        return target_path.resolve().as_uri()
+
+    def upload(
+        self,
+        calendars: Dict[str, Calendar],
+        calendars_paths: Dict[str, Path],
+        on_uploaded: Optional[UploadCallback] = None,
+        remote_dir: Optional[Path] = None
+    ) -> Dict[str, str]:
+        logger.info("Starting local upload of %s calendar(s) to %s", len(calendars), self.target_dir)
+        download_urls = {}
+
+        for calendar_name in calendars:
+            target_path = self.target_dir / remote_path(calendars_paths[calendar_name], remote_dir)
+            try:
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(target_path, "wb") as f:
+                    f.write(calendars[calendar_name].to_ical())
+                gzip_path = calendars_paths[calendar_name].with_name(f"{calendars_paths[calendar_name].name}.gz")
+                if gzip_path.exists():
+                    shutil.copyfile(gzip_path, target_path.with_name(gzip_path.name))
+            except OSError as e:
+                raise UploadError(f"Failed to write calendar '{calendar_name}': {e}") from e
+
+            download_urls[calendar_name] = self._download_url(target_path)
+            if on_uploaded:
+                on_uploaded(calendar_name, download_urls[calendar_name])
+
+        logger.info("Local upload completed. Wrote %s file(s)", len(download_urls))
+        return download_urls
+
+    def fetch_published(self, calendars_dir: Path) -> List[PublishedFile]:
+        return [
+            PublishedFile(
+                path=target_path.relative_to(self.target_dir),
+                content=target_path.read_bytes(),
+                link=self._download_url(target_path)
+            )
+            for target_path in sorted((self.target_dir / calendars_dir).glob("*.ics"))
+        ]
@@ -0,0 +1,56 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from config.calendar_generator import calendar_generator_config
+from config.warmstart import warmstart_config
+from src.checkpoints import CheckpointStore, hash_parts
+from src.storage import atomic_write
+from src.uploaders.fanout import FanOutUploader
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WarmStartResult:
+    backend: str
+    calendars: int = 0
+    restored: int = 0
+
+
+class WarmStart:
+    def __init__(self, checkpoints: CheckpointStore, uploader: FanOutUploader):
+        self.checkpoints = checkpoints
+        self.uploader = uploader
+        self.calendars_dir = Path(calendar_generator_config.CALENDAR_DIR)
+
+    def needed(self) -> bool:
+        return warmstart_config.ENABLED and not self.checkpoints.has_steps("upload:")
+
+    def bootstrap(self) -> List[WarmStartResult]:
+        results = []
+        for kind in self.uploader.backends:
+            result = WarmStartResult(backend=kind.name.lower())
+            try:
+                published_files = self.uploader.fetch_published(kind, self.calendars_dir)
+            except Exception as e:
+                logger.warning("Warm start could not read backend '%s': %s", result.backend, e)
+                continue
+
+            for published in published_files:
+                calendar_name = published.path.stem
+                self.checkpoints.complete(
+                    f"upload:{result.backend}:{calendar_name}", hash_parts(published.content), published.link
+                )
+                target_path = self.calendars_dir / published.path.name
+                if warmstart_config.RESTORE_FILES and not target_path.exists():
+                    atomic_write(target_path, published.content)
+                    result.restored += 1
+                result.calendars += 1
+
+            logger.info(
+                "Warm start from '%s': %s calendar(s), %s file(s) restored as the previous state",
+                result.backend, result.calendars, result.restored
+            )
+            results.append(result)
+        return results
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.workqueue import workqueue_config
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    account TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    lease_token INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, shard, available_at);
+"""
+
+
+def shard_for(account: str, shards: int) -> int:
+    digest = hashlib.sha1(account.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % max(shards, 1)
+
+
+@dataclass
+class Job:
+    id: int
+    idempotency_key: str
+    account: str
+    payload: Dict[str, Any]
+    shard: int
+    attempts: int
+    max_attempts: int
+    lease_expires: float
+    lease_token: int
+
+
+class JobQueue:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or workqueue_config.QUEUE_FILE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if "lease_token" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN lease_token INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=workqueue_config.BUSY_TIMEOUT, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            connection.execute("PRAGMA journal_mode=DELETE")
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def enqueue(
+        self,
+        account: str,
+        payload: Dict[str, Any],
+        idempotency_key: str,
+        shards: int = 1,
+        max_attempts: Optional[int] = None
+    ) -> bool:
+        now = time.time()
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO jobs "
+                "(idempotency_key, account, payload, shard, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    idempotency_key, account, json.dumps(payload), shard_for(account, shards),
+                    max_attempts or workqueue_config.MAX_ATTEMPTS, now, now, now
+                )
+            )
+        return cursor.rowcount > 0
+
+    def _expire_leases(self, connection: sqlite3.Connection, now: float) -> None:
+        connection.execute(
+            "UPDATE jobs SET status = 'failed', last_error = 'Lease expired after final attempt', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+            (now, now)
+        )
+        connection.execute(
+            "UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (now, now)
+        )
+
+    def lease(
+        self,
+        worker_id: str,
+        shard: Optional[int] = None,
+        visibility_timeout: Optional[float] = None
+    ) -> Optional[Job]:
+        now = time.time()
+        visibility_timeout = visibility_timeout or workqueue_config.VISIBILITY_TIMEOUT
+
+        with self._transaction() as connection:
+            self._expire_leases(connection, now)
+
+            row = None
+            if shard is not None:
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' AND available_at <= ? AND shard = ? "
+                    "ORDER BY available_at, id LIMIT 1",
+                    (now, shard)
+                ).fetchone()
+            if row is None:
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' AND available_at <= ? ORDER BY available_at, id LIMIT 1",
+                    (now,)
+                ).fetchone()
+            if row is None:
+                return None
+
+            lease_expires = now + visibility_timeout
+            lease_token = row["lease_token"] + 1
+            connection.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                "lease_token = ?, updated_at = ? WHERE id = ?",
+                (worker_id, lease_expires, lease_token, now, row["id"])
+            )
+
+        return Job(
+            id=row["id"],
+            idempotency_key=row["idempotency_key"],
+            account=row["account"],
+            payload=json.loads(row["payload"]),
+            shard=row["shard"],
+            attempts=row["attempts"] + 1,
+            max_attempts=row["max_attempts"],
+            lease_expires=lease_expires,
+            lease_token=lease_token
+        )
+
+    def heartbeat(self, job: Job, worker_id: str, visibility_timeout: Optional[float] = None) -> bool:
+        now = time.time()
+        lease_expires = now + (visibility_timeout or workqueue_config.VISIBILITY_TIMEOUT)
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ? AND lease_token = ? AND lease_expires >= ?",
+                (lease_expires, now, job.id, worker_id, job.lease_token, now)
+            )
+        if cursor.rowcount:
+            job.lease_expires = lease_expires
+        return cursor.rowcount > 0
+
+    def complete(self, job: Job, worker_id: str) -> bool:
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL, last_error = NULL, "
+                "updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ? AND lease_token = ?",
+                (time.time(), job.id, worker_id, job.lease_token)
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, job: Job, worker_id: str, error: str) -> bool:
+        now = time.time()
+        if job.attempts >= job.max_attempts:
+            status, available_at = "failed", now
+        else:
+            status, available_at = "queued", now + workqueue_config.RETRY_BACKOFF * 2 ** (job.attempts - 1)
+
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL, "
+                "last_error = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ? AND lease_token = ?",
+                (status, available_at, error[:2000], now, job.id, worker_id, job.lease_token)
+            )
+        return cursor.rowcount > 0
+
+    def pending(self) -> int:
+        with self._connect() as connection:
+            row = connection.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')").fetchone()
+        return row[0]
+
+    def stats(self, run_key: Optional[str] = None) -> Dict[str, int]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE idempotency_key LIKE ? GROUP BY status",
+                (f"{run_key}:%" if run_key else "%",)
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def failures(self, run_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT account, idempotency_key, attempts, last_error FROM jobs "
+                "WHERE status = 'failed' AND idempotency_key LIKE ? ORDER BY id",
+                (f"{run_key}:%" if run_key else "%",)
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,58 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config.workqueue import workqueue_config
+from src.logger import setup_logging
+from src.workqueue import JobQueue
+from src.workqueue.worker import Coordinator, Worker
+
+
+def _load_accounts(path: Path) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.workqueue", description="Multi-account schedule refresh queue")
+    parser.add_argument("--queue", type=Path, default=Path(workqueue_config.QUEUE_FILE))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="queue one job per account")
+    enqueue_parser.add_argument("accounts", type=Path, help="JSON list of {account, username, password_env}")
+    enqueue_parser.add_argument("--run-key", default=time.strftime("%Y-%m-%dT%H"))
+    enqueue_parser.add_argument("--shards", type=int, default=1)
+
+    worker_parser = commands.add_parser("worker", help="process jobs until stopped")
+    worker_parser.add_argument("--shard", type=int, default=None, help="preferred shard, steals from others when idle")
+    worker_parser.add_argument("--id", dest="worker_id", default=None)
+    worker_parser.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+
+    coordinate_parser = commands.add_parser("coordinate", help="enqueue accounts and run N local workers")
+    coordinate_parser.add_argument("accounts", type=Path)
+    coordinate_parser.add_argument("--workers", type=int, default=4)
+    coordinate_parser.add_argument("--run-key", default=time.strftime("%Y-%m-%dT%H"))
+
+    commands.add_parser("stats", help="job counts by status")
+
+    args = parser.parse_args()
+    setup_logging()
+    queue = JobQueue(args.queue)
+
+    if args.command == "enqueue":
+        Coordinator(queue, args.shards).enqueue(_load_accounts(args.accounts), args.run_key)
+    elif args.command == "worker":
+        Worker(queue, worker_id=args.worker_id, shard=args.shard).run(drain=args.drain)
+    elif args.command == "coordinate":
+        stats = Coordinator(queue, args.workers).run(_load_accounts(args.accounts), args.run_key)
+        if stats.get("failed"):
+            sys.exit(1)
+    elif args.command == "stats":
+        print(json.dumps(queue.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
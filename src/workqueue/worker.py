@@ -0,0 +1,180 @@
+import logging
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.dedup import dedup_config
+from config.workqueue import workqueue_config
+from src.workqueue import Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+MAIN_SCRIPT = PROJECT_ROOT / "main.py"
+
+
+class JobError(Exception):
+    pass
+
+
+def _workspace_name(account: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", account)
+
+
+class Worker:
+    def __init__(self, queue: JobQueue, worker_id: Optional[str] = None, shard: Optional[int] = None):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.shard = shard
+        self.processed = 0
+        self.failed = 0
+
+    def _environment(self, job: Job) -> Dict[str, str]:
+        env = dict(os.environ)
+        env["USERNAME"] = job.payload.get("username") or job.account
+        env["CALENDAR_DIR"] = f"calendars/{_workspace_name(job.account)}"
+        env["LESSON_STORE"] = str(Path(dedup_config.STORE_FILE).resolve())
+        env["GROUP_CALENDARS"] = "1"
+
+        password_env = job.payload.get("password_env")
+        if password_env:
+            if password_env not in os.environ:
+                raise JobError(f"Password variable {password_env} is not set on this worker")
+            env["PASSWORD"] = os.environ[password_env]
+        return env
+
+    def _heartbeat(self, job: Job, stop: threading.Event) -> None:
+        interval = workqueue_config.VISIBILITY_TIMEOUT / 3
+        while not stop.wait(interval):
+            if not self.queue.heartbeat(job, self.worker_id):
+                logger.warning("Lost the lease on job %s (%s)", job.id, job.account, extra={"account": job.account})
+                return
+
+    def execute(self, job: Job) -> None:
+        workspace = Path(workqueue_config.WORKSPACE_DIR).resolve() / _workspace_name(job.account)
+        workspace.mkdir(parents=True, exist_ok=True)
+
+        try:
+            result = subprocess.run(
+                [sys.executable, str(MAIN_SCRIPT)],
+                cwd=workspace,
+                env=self._environment(job),
+                capture_output=True,
+                text=True,
+                timeout=workqueue_config.JOB_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            raise JobError(f"Timed out after {workqueue_config.JOB_TIMEOUT}s")
+
+        if result.returncode != 0:
+            tail = (result.stderr or result.stdout or "").strip().splitlines()[-5:]
+            raise JobError(f"Exit code {result.returncode}: {' | '.join(tail)}")
+
+    def process(self, job: Job) -> bool:
+        started_at = time.time()
+        logger.info(
+            "Worker %s took job %s for %s (attempt %s/%s)",
+            self.worker_id, job.id, job.account, job.attempts, job.max_attempts, extra={"account": job.account}
+        )
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        heartbeat.start()
+        try:
+            self.execute(job)
+        except Exception as e:
+            self.failed += 1
+            if not self.queue.fail(job, self.worker_id, str(e)):
+                logger.warning(
+                    "Job %s for %s was leased again elsewhere, dropping this failure", job.id, job.account,
+                    extra={"account": job.account}
+                )
+            logger.error("Job %s for %s failed: %s", job.id, job.account, e, extra={"account": job.account})
+            return False
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if not self.queue.complete(job, self.worker_id):
+            logger.warning(
+                "Job %s for %s was leased again elsewhere, dropping this result", job.id, job.account,
+                extra={"account": job.account}
+            )
+            return False
+
+        self.processed += 1
+        duration = time.time() - started_at
+        logger.info(
+            "Job %s for %s finished in %.2f seconds", job.id, job.account, duration,
+            extra={"account": job.account, "duration_ms": round(duration * 1000)}
+        )
+        return True
+
+    def run(self, drain: bool = True) -> int:
+        logger.info("Worker %s started (shard %s)", self.worker_id, self.shard)
+        while True:
+            job = self.queue.lease(self.worker_id, shard=self.shard)
+            if job is not None:
+                self.process(job)
+                continue
+            if drain and not self.queue.pending():
+                break
+            time.sleep(workqueue_config.POLL_INTERVAL)
+
+        logger.info("Worker %s stopped: %s done, %s failed", self.worker_id, self.processed, self.failed)
+        return self.processed
+
+
+class Coordinator:
+    def __init__(self, queue: JobQueue, shards: int):
+        self.queue = queue
+        self.shards = max(shards, 1)
+
+    def enqueue(self, accounts: List[Dict[str, Any]], run_key: str) -> int:
+        enqueued = 0
+        for entry in accounts:
+            account = entry.get("account") or entry["username"]
+            payload = {key: value for key, value in entry.items() if key in ("username", "password_env")}
+            if self.queue.enqueue(account, payload, idempotency_key=f"{run_key}:{account}", shards=self.shards):
+                enqueued += 1
+        logger.info("Enqueued %s of %s account(s) for run %s", enqueued, len(accounts), run_key)
+        return enqueued
+
+    def spawn(self) -> List[subprocess.Popen]:
+        return [
+            subprocess.Popen(
+                [
+                    sys.executable, "-m", "src.workqueue",
+                    "--queue", str(self.queue.path.resolve()),
+                    "worker", "--shard", str(shard), "--drain"
+                ],
+                cwd=PROJECT_ROOT
+            )
+            for shard in range(self.shards)
+        ]
+
+    def run(self, accounts: List[Dict[str, Any]], run_key: str) -> Dict[str, int]:
+        started_at = time.time()
+        self.enqueue(accounts, run_key)
+        workers = self.spawn()
+        for worker in workers:
+            worker.wait()
+
+        stats = self.queue.stats(run_key)
+        logger.info(
+            "Coordinator finished in %.2f seconds with %s worker(s): %s",
+            time.time() - started_at, len(workers), stats
+        )
+        for failure in self.queue.failures(run_key):
+            logger.error(
+                "Account %s failed after %s attempt(s): %s",
+                failure["account"], failure["attempts"], failure["last_error"], extra={"account": failure["account"]}
+            )
+        return stats